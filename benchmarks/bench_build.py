@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+bench_build.py - time the build.py pipeline stages on synthetic workbooks.
+
+For each requested scale (1x / 10x / 100x the real 259-bhajan songbook, see
+make_corpus.py) this generates the corpus if it is missing, then times every
+stage over repeated runs after a warm-up run:
+
+    xlsx read            pd.read_excel of the Lapa1 sheet
+    clean (scalar)       df[col].apply(clean_text / clean_latvian_text)
+    clean (vectorized)   clean_text_series / clean_latvian_text_series
+    assemble             assemble_bhajans on the cleaned frame
+    ingest pandas        load_bhajan_data end to end
+    ingest openpyxl      load_bhajan_data_streaming end to end
+    render               render_template of the real template.html to a temp file
+    render (compact)     the same with --format compact (encode + render)
+
+plus, once (independent of scale), compute_audio_assets over the repo's
+audio/ with a cold and with a warm hash cache.
+
+Each stage reports min / median / mean / stdev / IQR over the samples; the
+median is the number to compare. Results are written as JSON (default
+benchmarks/results/<git short sha>.json); --compare A.json B.json prints the
+median ratio per stage.
+
+Usage:
+    python benchmarks/bench_build.py [--scales 1 10] [--repeat 5] [--out FILE]
+    python benchmarks/bench_build.py --compare base.json new.json
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import build  # noqa: E402
+import make_corpus  # noqa: E402
+
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+TEXT_COLUMNS = ["Original", "English", "Russian", "Bhajan_Title", "Author", "Category",
+                "Spanish", "Italian", "French"]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    if len(ordered) >= 4:
+        q1, _, q3 = statistics.quantiles(ordered, n=4)
+    else:
+        q1, q3 = ordered[0], ordered[-1]
+    return {
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "iqr": q3 - q1,
+        "samples": samples,
+    }
+
+
+def time_stage(fn, repeat, setup=None):
+    """Run fn once to warm up, then `repeat` timed runs (setup excluded)."""
+    samples = []
+    for i in range(repeat + 1):
+        arg = setup() if setup else None
+        gc.collect()
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        elapsed = time.perf_counter() - start
+        if i:
+            samples.append(elapsed)
+    return summarize(samples)
+
+
+def read_frame(xlsx_path):
+    import pandas as pd
+
+    df = pd.read_excel(xlsx_path, sheet_name="Lapa1")
+    df = df.dropna(subset=["Bhajan_Title", "Author", "Category"])
+    for col in ["Original", "English", "Russian", "Latvian", "Spanish", "Italian", "French"]:
+        df[col] = df[col].fillna("")
+    return df
+
+
+def clean_scalar(df):
+    for col in TEXT_COLUMNS:
+        df[col] = df[col].apply(build.clean_text)
+    df["Latvian"] = df["Latvian"].apply(build.clean_latvian_text)
+
+
+def clean_vectorized(df):
+    build.clean_columns(df, TEXT_COLUMNS + ["Latvian"])
+
+
+def cleaned_frame(raw):
+    import pandas as pd
+
+    df = raw.copy()
+    clean_vectorized(df)
+    df["Verse_Number"] = pd.to_numeric(df["Verse_Number"], errors="coerce")
+    df = df.dropna(subset=["Verse_Number"])
+    df["Verse_Number"] = df["Verse_Number"].astype(int)
+    return df
+
+
+def bench_scale(scale, repeat, corpus_dir):
+    xlsx_path = corpus_dir / f"bhajans-{scale}x.xlsx"
+    if not xlsx_path.exists():
+        make_corpus.write_corpus(scale, corpus_dir)
+    raw = read_frame(xlsx_path)
+    cleaned = cleaned_frame(raw)
+    extra = list(build.EXTRA_LANG_COLUMNS)
+    bhajans = build.assemble_bhajans(cleaned, extra)
+    template_text = (REPO_ROOT / "template.html").read_text(encoding="utf-8")
+
+    results = {}
+
+    def run(name, fn, setup=None):
+        print(f"  {scale}x {name} ...", end="", flush=True)
+        results[name] = time_stage(fn, repeat, setup)
+        print(f" median {results[name]['median']:.3f}s")
+
+    run("xlsx read", lambda: read_frame(xlsx_path))
+    run("clean (scalar)", clean_scalar, setup=raw.copy)
+    run("clean (vectorized)", clean_vectorized, setup=raw.copy)
+    run("assemble", lambda: build.assemble_bhajans(cleaned, extra))
+    run("ingest pandas", lambda: build.load_bhajan_data(xlsx_path))
+    run("ingest openpyxl", lambda: build.load_bhajan_data_streaming(xlsx_path))
+    run("search index", lambda: build.build_search_index(bhajans))
+    run("search index (per language)", lambda: [
+        build.build_search_index(bhajans, field) for field in build.translation_fields(bhajans)])
+    run("search index (bm25)", lambda: build.build_search_index(bhajans, frequencies=True))
+    run("substring index", lambda: build.build_substring_index(bhajans))
+    run("fuzzy index", lambda: build.build_fuzzy_index(bhajans))
+    run("snippet table", lambda: build.build_snippet_table(bhajans))
+    run("autocomplete dictionary", lambda: build.build_autocomplete_dictionary(bhajans))
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = Path(tmp) / "index.html"
+
+        def render(data_format):
+            if out_path.exists():
+                out_path.unlink()
+            value, encoders = bhajans, {}
+            if data_format == "compact":
+                value = build.encode_compact_bhajans(bhajans)
+                encoders["{{BHAJANS_JSON}}"] = build.iter_compact_chunks
+            build.render_template(template_text, {
+                "{{BHAJANS_JSON}}": value,
+                "{{CONTENT_FILES_JSON}}": {},
+                "{{YOUTUBE_IDS_JSON}}": {},
+                "{{AUDIO_IDS_JSON}}": {},
+            }, out_path, encoders)
+        run("render", lambda: render("json"))
+        run("render (compact)", lambda: render("compact"))
+    return {"rows": len(raw), "bhajans": len(bhajans), "stages": results}
+
+
+def bench_audio(repeat):
+    audio_ids = build.load_audio_map(REPO_ROOT / "data" / "audio_map.json")
+    results = {}
+    results["audio hashing (cold)"] = time_stage(
+        lambda: build.compute_audio_assets(audio_ids, hash_cache_path=None), repeat)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / "audio-hashes.json"
+        build.compute_audio_assets(audio_ids, hash_cache_path=cache_path)
+        results["audio hashing (warm cache)"] = time_stage(
+            lambda: build.compute_audio_assets(audio_ids, hash_cache_path=cache_path), repeat)
+    for name, stats in results.items():
+        print(f"  {name}: median {stats['median']:.3f}s")
+    return results
+
+
+def compare(base_path, new_path):
+    base = json.loads(Path(base_path).read_text(encoding="utf-8"))
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))
+    print(f"{'scale':<7} {'stage':<28} {base['revision']:>10} {new['revision']:>10} {'ratio':>7}")
+    for scale, scale_new in new["scales"].items():
+        scale_base = base["scales"].get(scale, {}).get("stages", {})
+        for stage, stats in scale_new["stages"].items():
+            if stage not in scale_base:
+                continue
+            b, n = scale_base[stage]["median"], stats["median"]
+            print(f"{scale:<7} {stage:<28} {b:>10.4f} {n:>10.4f} {n / b:>6.2f}x")
+    for stage, stats in new.get("audio", {}).items():
+        if stage in base.get("audio", {}):
+            b, n = base["audio"][stage]["median"], stats["median"]
+            print(f"{'-':<7} {stage:<28} {b:>10.4f} {n:>10.4f} {n / b:>6.2f}x")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", type=int, nargs="+", default=[1, 10],
+                     help="corpus sizes to run (multiples of 259 bhajans); 100 is slow")
+    ap.add_argument("--repeat", type=int, default=5, help="timed runs per stage (after 1 warm-up)")
+    ap.add_argument("--corpus-dir", default=str(make_corpus.DEFAULT_OUT_DIR))
+    ap.add_argument("--out", default=None, help="results JSON (default results/<git sha>.json)")
+    ap.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"),
+                     help="print median ratios between two results files and exit")
+    args = ap.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    revision = git_revision()
+    report = {
+        "revision": revision,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "scales": {},
+    }
+    for scale in args.scales:
+        report["scales"][f"{scale}x"] = bench_scale(scale, args.repeat, Path(args.corpus_dir))
+    report["audio"] = bench_audio(args.repeat)
+
+    out_path = Path(args.out) if args.out else RESULTS_DIR / f"{revision}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
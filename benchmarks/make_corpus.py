@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+make_corpus.py - synthetic Lapa1-shaped workbooks for the build benchmarks.
+
+Generates Bhajans.xlsx look-alikes at a multiple of the real songbook's size
+(259 bhajans, ~6.6 verses each, ~1.7k rows at 1x). Cell text is built from
+realistic vocabularies: IAST Bengali/Sanskrit for Original (including ô, ĵ,
+ṅ, ṛ, ṣ ... and the `_x000D_` line-break artefacts ~65% of real Original
+cells carry), Cyrillic for Russian, Latvian with ā/ē/ī/ū/ļ/ķ/ģ/ņ/š/ž/č
+(plus the occasional 'English\\tLatvian' and stray English prose lines that
+clean_latvian_text strips), and English/Spanish/Italian/French prose.
+
+Output is deterministic for a given (scale, seed), so timings are
+comparable between commits.
+
+Usage:
+    python benchmarks/make_corpus.py [--scales 1 10 100] [--seed 1]
+                                     [--out-dir benchmarks/corpus]
+"""
+import argparse
+import random
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUT_DIR = REPO_ROOT / "benchmarks" / "corpus"
+
+BASE_BHAJANS = 259
+COLUMNS = ["Category", "Bhajan_Title", "Author", "Verse_Number", "Original",
+           "English", "Russian", "Latvian", "Spanish", "Italian", "French"]
+
+IAST_SYLLABLES = [
+    "kṛ", "ṣṇa", "gau", "rāṅ", "ga", "bô", "li", "te", "ĵa", "di", "hô", "i",
+    "rā", "dhā", "mā", "dha", "va", "nan", "da", "śrī", "gu", "ru", "de", "vā",
+    "nā", "ma", "ha", "ri", "bhaj", "ja", "na", "pre", "mô", "sev", "ā", "pa",
+    "dô", "ṭi", "cai", "tan", "ya", "ni", "tā", "ī", "vṛn", "dā", "van", "ṁ",
+]
+ENGLISH_WORDS = (
+    "the holy name of the Lord is the only shelter in this age of quarrel and "
+    "hypocrisy O my mind worship the lotus feet of Śrī Gaurāṅga who is the "
+    "ocean of mercy and the friend of the fallen souls having achieved this rare "
+    "human body you should not waste your time in useless talk"
+).split()
+RUSSIAN_WORDS = (
+    "святое имя Господа единственное прибежище в этот век раздоров и лицемерия "
+    "о мой ум поклоняйся лотосным стопам Шри Гауранги который есть океан "
+    "милости и друг падших душ получив это редкое человеческое тело"
+).split()
+LATVIAN_WORDS = (
+    "Kunga svētais vārds ir vienīgais patvērums šajā strīdu un liekulības "
+    "laikmetā ak mans prāts pielūdz Šrī Gaurāngas lotospēdas kurš ir žēlsirdības "
+    "okeāns un kritušo dvēseļu draugs ieguvis šo reto cilvēka ķermeni ģimene "
+    "ņem čakli"
+).split()
+SPANISH_WORDS = (
+    "el santo nombre del Señor es el único refugio en esta era de riña oh mente "
+    "mía adora los pies de loto de Śrī Gaurāṅga océano de misericordia"
+).split()
+ITALIAN_WORDS = (
+    "il santo nome del Signore è l’unico rifugio in questa era di litigi o mia "
+    "mente adora i piedi di loto di Śrī Gaurāṅga oceano di misericordia"
+).split()
+FRENCH_WORDS = (
+    "le saint nom du Seigneur est le seul refuge en cet âge de querelle ô mon "
+    "mental adore les pieds pareils au lotus de Śrī Gaurāṅga océan de miséricorde"
+).split()
+ENGLISH_PROSE_LINE = ("You are doing this having achieved the rare human body, "
+                      "what will you think about at the time of death")
+
+
+def _iast_word(rnd):
+    return "".join(rnd.choice(IAST_SYLLABLES) for _ in range(rnd.randint(1, 4)))
+
+
+def _iast_phrase(rnd, words):
+    return " ".join(_iast_word(rnd) for _ in range(words))
+
+
+def _prose(rnd, vocabulary, length):
+    words = []
+    while sum(len(w) + 1 for w in words) < length:
+        words.append(rnd.choice(vocabulary))
+    return " ".join(words).capitalize() + "."
+
+
+def _original_cell(rnd, number):
+    lines = [_iast_phrase(rnd, rnd.randint(3, 6)) + "," for _ in range(4)]
+    lines[-1] = lines[-1].rstrip(",") + f" ({number})"
+    sep = "_x000D_\n" if rnd.random() < 0.65 else "\n"
+    return sep.join(lines)
+
+
+def _latvian_cell(rnd):
+    text = _prose(rnd, LATVIAN_WORDS, 176)
+    roll = rnd.random()
+    if roll < 0.01:
+        return f"{ENGLISH_PROSE_LINE}\t{text}"
+    if roll < 0.02:
+        return f"{text}_x000D_\n{ENGLISH_PROSE_LINE}_x000D_\n\n{_prose(rnd, LATVIAN_WORDS, 60)}"
+    return text
+
+
+def generate_rows(scale, seed=1):
+    """Yield Lapa1 data rows (in COLUMNS order) for scale x the real corpus."""
+    rnd = random.Random(seed)
+    authors = [f"Śrīla {_iast_phrase(rnd, 2).title()} Gosvāmī" for _ in range(63)]
+    categories = [f"Śrī {_iast_word(rnd).title()}" for _ in range(20)]
+    for i in range(BASE_BHAJANS * scale):
+        title = f"{_iast_phrase(rnd, rnd.randint(2, 4)).title()} {i + 1}"
+        author = rnd.choice(authors)
+        category = rnd.choice(categories)
+        numbers = list(range(1, min(28, max(1, int(rnd.expovariate(1 / 6.6)) + 1)) + 1))
+        if rnd.random() < 0.05:
+            rnd.shuffle(numbers)  # exercise the verse sort
+        for number in numbers:
+            yield [
+                category, title, author, number,
+                _original_cell(rnd, number),
+                _prose(rnd, ENGLISH_WORDS, 190),
+                _prose(rnd, RUSSIAN_WORDS, 176),
+                _latvian_cell(rnd),
+                _prose(rnd, SPANISH_WORDS, 190),
+                _prose(rnd, ITALIAN_WORDS, 190),
+                _prose(rnd, FRENCH_WORDS, 190),
+            ]
+        if rnd.random() < 0.01:
+            yield [None] * len(COLUMNS)  # blank row, dropped by ingestion
+
+
+def write_corpus(scale, out_dir=DEFAULT_OUT_DIR, seed=1):
+    """Write bhajans-{scale}x.xlsx (streamed, write-only) and return its path."""
+    from openpyxl import Workbook
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / f"bhajans-{scale}x.xlsx"
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Lapa1")
+    ws.append(COLUMNS)
+    rows = 0
+    for row in generate_rows(scale, seed):
+        ws.append(row)
+        rows += 1
+    wb.save(out_path)
+    print(f"Wrote {out_path} ({BASE_BHAJANS * scale} bhajans, {rows} rows)")
+    return out_path
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out-dir", default=str(DEFAULT_OUT_DIR))
+    args = ap.parse_args()
+    for scale in args.scales:
+        write_corpus(scale, Path(args.out_dir), args.seed)
+
+
+if __name__ == "__main__":
+    main()
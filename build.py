@@ -11,7 +11,7 @@ Reads Bhajans.xlsx (sheet "Lapa1"; columns Category, Bhajan_Title, Author,
 Verse_Number, Original, English, Russian, Latvian, and optionally Spanish,
 Italian, French) with pandas, ports the clean_text / clean_latvian_text
 logic from generate_html.py, and injects the resulting JSON into
-template.html's three placeholders. YOUTUBE_IDS and AUDIO_IDS are loaded
+template.html's data placeholders. YOUTUBE_IDS and AUDIO_IDS are loaded
 from data/youtube_map.json and data/audio_map.json (single source of truth)
 and re-injected into the template.
 
@@ -30,43 +30,272 @@ Emits:
                           for the 32 .ogg files actually referenced by AUDIO_IDS.
                           `url` carries the ?v={hash8} query string; `hash` is
                           the full sha256 for integrity verification.
+    content/<group>-<bucket>.<hash8>.json
+                        - with --split-languages / --lazy-verses only: verse
+                          chunks and translation shards (see layout_content);
+                          stale files from earlier builds are deleted.
+    content/search[-<language>].<hash8>.json
+                        - with --search-index only: prebuilt search indexes,
+                          one main plus one per translation (see
+                          build_search_index); with --bm25 also term
+                          frequencies and field-length statistics.
+    content/substring.<hash8>.json
+                        - with --substring-index only: suffix array over the
+                          searchable text (see build_substring_index).
+    content/fuzzy.<hash8>.json
+                        - with --fuzzy-index only: phonetic-key bigram index
+                          (see build_fuzzy_index).
+    content/snippets.<hash8>.json
+                        - with --snippets only: folded-to-original offset
+                          table for search snippets (see
+                          build_snippet_table).
+    content/autocomplete.<hash8>.json
+                        - with --autocomplete only: front-coded dictionary of
+                          title, author and first-line words for search
+                          suggestions (see build_autocomplete_dictionary).
+    search-worker.js   - with --search-worker only: the page's search engine
+                          as a Web Worker (from template.html's search
+                          section + tools/search_worker_template.js); a
+                          stale one is deleted when the flag is off.
+    <artifact>.gz, <artifact>.br
+                        - with --compress only: precompressed siblings of all
+                          of the above (gzip -9, brotli q11 if installed) for
+                          static servers that serve them as-is.
+
+    build-manifest.json - {"inputs": {path: sha256}, "artifacts": {path:
+                          {sha256, size}}}. Artifacts whose bytes would not
+                          change are not rewritten, and version.json keeps its
+                          date unless something else changed.
 
 Usage:
     python build.py [--source-html index.html] [--template template.html]
                      [--xlsx Bhajans.xlsx] [--out index.html]
                      [--version N | --bump] [--notes "..."]
+                     [--engine pandas|openpyxl] [--no-cache] [--jobs N]
+                     [--profile] [--split-languages]
+                     [--lazy-verses [--bucket-size N]] [--compress]
+                     [--format json|compact] [--json-parse] [--search-index]
+                     [--substring-index] [--fuzzy-index] [--search-worker]
+                     [--persist-search] [--snippets] [--autocomplete]
+                     [--bm25]
+
+Ingestion: --engine pandas (default) reads the sheet into a DataFrame;
+--engine openpyxl streams rows with openpyxl's read-only iter_rows straight
+into the bhajan/verse structures (bounded memory, no DataFrame). Both must
+produce identical BHAJANS -- check with tools/verify_roundtrip.py --engine.
+
+Ingest cache: the cleaned bhajan list is cached as JSON in .cache/ingest/,
+keyed by the sha256 of Bhajans.xlsx plus CLEANING_RULES_VERSION. When
+neither changed (e.g. only template.html or data/*.json were edited) the
+workbook is not parsed at all. --no-cache bypasses it.
+
+Content layout: by default every verse is inlined in BHAJANS in every
+language. --split-languages keeps only number + original inline and moves
+each translation into its own content/<lang>-000.<hash8>.json shard, listed
+in the page's CONTENT_FILES literal; the page fetches a shard the first time
+that language is shown and the service worker caches it (content-v1).
+--lazy-verses goes further: BHAJANS becomes a small catalog (title, author,
+category, first line, verse count) and the verses move into
+content-hashed chunks of --bucket-size bhajans, fetched when a bhajan
+is opened and precached by the service worker in the background. The two
+combine (per-bucket chunks per language).
+
+Wire format: --format compact replaces the BHAJANS object literal with a
+dictionary-encoded one (author/category string tables, bhajan fields as
+columns, verses as positional rows; see encode_compact_bhajans) wrapped in
+decodeBhajans(...), which rebuilds exactly the plain structure at startup.
+
+--json-parse emits BHAJANS, YOUTUBE_IDS and AUDIO_IDS as JSON.parse('...')
+string literals instead of object literals (combines with --format
+compact as decodeBhajans(JSON.parse('...'))). Engines hand the string to
+their JSON parser instead of the full JS parser; the gain depends on the
+engine (about 5% of the BHAJANS parse time under V8/Node 20).
+
+Search: --search-index tokenizes title, author, first line and each
+verse's original text at build time (folded exactly like the page's
+normalizeSearch) into a term -> postings inverted index keyed by bhajan,
+field and verse, written to content/search.<hash8>.json and listed in
+CONTENT_FILES. The page fetches it on the first keystroke and answers
+queries by intersecting postings lists (each query token a word prefix)
+instead of scanning every bhajan's text; with --lazy-verses this also
+means searching no longer downloads every verse chunk. Each translation
+gets its own content/search-<language>.<hash8>.json over its verse text,
+folded for that language (fold_search: й kept distinct in Russian, œ/æ
+spelled out, soft hyphens dropped); the page fetches one only while that
+language is the working language or on display.
+
+--substring-index keeps the page's exact substring semantics instead: a
+suffix array over the normalized titles and verse text (numpy prefix
+doubling at build time, content/substring.<hash8>.json) that the page
+binary-searches, giving the same results as its includes() scan in
+O(m log n) per query. Per-language indexes still add translation matches
+when --search-index is also given.
+
+--fuzzy-index adds spelling tolerance for the romanized Bengali/Sanskrit:
+every word of the titles, authors and original verse text is reduced to
+a phonetic key (phonetic_key: ô/o/a, ĵ/j/y, v/b, ś/ṣ/sh and doubled vowels
+collapse), and content/fuzzy.<hash8>.json indexes the keys by bigram.
+The page reduces each query word the same way and lists bhajans whose
+words are within 1-2 edits of it (by word length) after the exact matches.
+
+--bm25 (with --search-index) ranks by relevance instead of by match kind:
+every word index posting also carries the term's frequency in its field,
+and each index lists every bhajan's per-field word counts and their
+means. A bhajan then matches when each query word starts a word of any
+of its fields, and the page orders the matches by BM25 scores per field
+(each verse scored on its own), weighted by field boosts (BM25_BOOSTS).
+
+Precompression: --compress writes .gz (and, with the optional brotli
+package, .br) next to every artifact, in parallel threads. The source
+sha256 each sibling was made from is kept in .cache/compress.json, so
+unchanged artifacts are not recompressed; a raw-vs-compressed size table is
+printed either way. A build without --compress deletes the siblings of the
+artifacts it rewrites (and any older than their artifact), so a server
+preferring precompressed files never serves a stale one.
 
 Version handling: by default the version number is carried over unchanged
 from the existing version.json (or starts at 1 if none exists). Pass --bump
 to increment it by one, or --version N to set it explicitly.
 """
 import argparse
+import base64
+import bisect
 import hashlib
 import json
+import math
+import os
 import re
+import time
+import tracemalloc
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date, datetime, timezone
 from pathlib import Path
 
-import pandas as pd
-
 REPO_ROOT = Path(__file__).resolve().parent
 
+# pandas is imported lazily (only by the pandas ingestion engine) so that
+# ingest-cache hits and the openpyxl engine never pay its ~0.5 s import.
+
+# ---------------------------------------------------------------------------
+# Build phase profiling (--profile)
+# ---------------------------------------------------------------------------
+
+BUILD_PROFILE_PATH = REPO_ROOT / "build-profile.json"
+
+# Phase records (in start order) while --profile is active, else None.
+_profile_records = None
+# Open phases: (record, start_time, [peak carried over from nested phases])
+_profile_stack = []
+
+
+def start_profiling():
+    global _profile_records
+    _profile_records = []
+    _profile_stack.clear()
+    tracemalloc.start()
+
+
+def stop_profiling():
+    """Stop tracing and return the recorded phases."""
+    global _profile_records
+    records, _profile_records = _profile_records, None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return records or []
+
+
+@contextmanager
+def profile_phase(name):
+    """Time a build phase and record its tracemalloc peak.
+
+    Phases may nest; an outer phase's peak includes its children's and the
+    table indents children under it. Does nothing unless start_profiling()
+    was called.
+    """
+    if _profile_records is None:
+        yield
+        return
+    if _profile_stack:
+        carried = _profile_stack[-1][2]
+        carried[0] = max(carried[0], tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+    record = {"phase": name, "depth": len(_profile_stack), "seconds": None, "peak_bytes": None}
+    _profile_records.append(record)
+    _profile_stack.append((record, time.perf_counter(), [0]))
+    try:
+        yield
+    finally:
+        _, started, carried = _profile_stack.pop()
+        record["seconds"] = round(time.perf_counter() - started, 6)
+        record["peak_bytes"] = max(tracemalloc.get_traced_memory()[1], carried[0])
+        if _profile_stack:
+            outer = _profile_stack[-1][2]
+            outer[0] = max(outer[0], record["peak_bytes"])
+
+
+def report_profile(records, out_path=BUILD_PROFILE_PATH, meta=None):
+    """Print the phase table and write it, plus `meta`, as JSON to out_path."""
+    total = sum(r["seconds"] for r in records if r["depth"] == 0)
+    print(f"{'phase':<44} {'seconds':>9} {'peak MiB':>9}")
+    for r in records:
+        label = "  " * r["depth"] + r["phase"]
+        print(f"{label:<44} {r['seconds']:>9.3f} {r['peak_bytes'] / 2**20:>9.1f}")
+    print(f"{'total (top-level phases)':<44} {total:>9.3f}")
+
+    report = dict(meta or {})
+    report["total_seconds"] = round(total, 6)
+    report["phases"] = records
+    out_path.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote {out_path.name} (timings include tracemalloc overhead).")
+
+
 # ---------------------------------------------------------------------------
 # Text cleaning (ported verbatim in behavior from generate_html.py)
 # ---------------------------------------------------------------------------
 
+# Bump whenever clean_text / clean_latvian_text / load_bhajan_data change
+# their output: it is part of the ingest cache key, so stale caches are
+# never reused.
+CLEANING_RULES_VERSION = 1
+
+
+def _isna(value):
+    """Scalar pd.isna() without importing pandas (None, NaN, pd.NA, pd.NaT)."""
+    if value is None:
+        return True
+    if isinstance(value, float):
+        return value != value
+    return type(value).__name__ in ("NAType", "NaTType")
+
+
+# Precompiled patterns shared by the scalar and column-at-a-time cleaners.
+_BLANK_LINES_RE = re.compile(r"\n\s*\n")
+# Whitespace other than the line separator; \s matches exactly what
+# str.split() splits on, so collapsing runs of it to one space and trimming
+# the spaces next to each "\n" reproduces " ".join(line.split()) per line.
+# Runs that are already a single plain space (the vast majority) are left
+# out: substituting them would be a no-op, so skipping them makes the
+# whole-column pass several times cheaper.
+_NONTRIVIAL_WS_RE = re.compile(r"(?: [^\S\n]|[^\S\n ])[^\S\n]*")
+# Cheap pre-check: a column without double spaces and without any
+# whitespace other than " "/"\n" needs no substitution at all.
+_NON_SPACE_WS_RE = re.compile(r"[^\S\n ]")
+_LATVIAN_CHARS_RE = re.compile("[ļķģņšžč]")
+_WORD_RE = re.compile(r"\b[a-z]+\b")
+
 
 def clean_text(text):
     """Clean text fields - remove unwanted symbols (same logic as data_loader.py)."""
-    if pd.isna(text):
+    if _isna(text):
         return ""
     text = str(text)
     text = text.replace("_x000D_\n", "\n")
     text = text.replace("_x000D_", "\n")
     text = text.replace("\r\n", "\n")
     text = text.replace("\r", "\n")
-    text = re.sub(r"\n\s*\n", "\n", text)
+    text = _BLANK_LINES_RE.sub("\n", text)
     lines = text.split("\n")
     cleaned_lines = [" ".join(line.split()) for line in lines]
     text = "\n".join(cleaned_lines)
@@ -90,14 +319,14 @@ def clean_latvian_text(text):
     Excel artefact: some cells contain 'English text\\tLatvian text' on one
     line, or English-only lines inserted between Latvian paragraphs.
     """
-    if pd.isna(text):
+    if _isna(text):
         return ""
     text = str(text)
     text = text.replace("_x000D_\n", "\n")
     text = text.replace("_x000D_", "\n")
     text = text.replace("\r\n", "\n")
     text = text.replace("\r", "\n")
-    text = re.sub(r"\n\s*\n", "\n", text)
+    text = _BLANK_LINES_RE.sub("\n", text)
     cleaned_lines = []
     for line in text.split("\n"):
         # TAB separator: "English\tLatvian" -> take Latvian part
@@ -111,13 +340,94 @@ def clean_latvian_text(text):
             cleaned_lines.append(line)
             continue
         # Long lines with English prose markers -> skip
-        words = set(re.findall(r"\b[a-z]+\b", line.lower()))
+        words = set(_WORD_RE.findall(line.lower()))
         if len(words & _english_markers) >= 2 and len(line) > 30:
             continue
         cleaned_lines.append(line)
     return "\n".join(cleaned_lines).strip()
 
 
+# ---------------------------------------------------------------------------
+# Column-at-a-time cleaning (byte-identical to the scalar path)
+# ---------------------------------------------------------------------------
+
+# Cells of a column are joined with this separator and cleaned as ONE string,
+# so every replace/regex pass runs once per column in C instead of once per
+# cell (pandas' object-dtype .str methods are a Python loop per element). It
+# is neither whitespace nor "\n", so no rule can match across two cells.
+_CELL_SEP = "\x00"
+_TAB_PREFIX_RE = re.compile(r"(?:^|(?<=[\n\x00]))[^\n\x00]*\t")
+_EMPTY_LINES_RE = re.compile(r"\n{2,}")
+
+
+def _column_values(series):
+    """NaN -> "", everything else str() -- the scalar cleaners' first step."""
+    # tolist() converts in bulk; iterating a Series boxes every element.
+    return [v if type(v) is str else "" if _isna(v) else str(v) for v in series.tolist()]
+
+
+def _normalized_newlines(text):
+    """Shared prelude of both cleaners: newline + blank-line normalization."""
+    text = text.replace("_x000D_\n", "\n")
+    text = text.replace("_x000D_", "\n")
+    text = text.replace("\r\n", "\n")
+    text = text.replace("\r", "\n")
+    return _BLANK_LINES_RE.sub("\n", text)
+
+
+def _collapsed_lines(text):
+    """Apply " ".join(line.split()) to every line of text at once."""
+    if "  " in text or _NON_SPACE_WS_RE.search(text):
+        text = _NONTRIVIAL_WS_RE.sub(" ", text)
+    return text.replace(" \n", "\n").replace("\n ", "\n")
+
+
+def _object_series(values, index):
+    import pandas as pd
+
+    return pd.Series(values, index=index, dtype=object)
+
+
+def clean_text_series(series):
+    """Vectorized clean_text over a whole column; returns an object Series."""
+    values = _column_values(series)
+    column = _CELL_SEP.join(values)
+    if not values or column.count(_CELL_SEP) != len(values) - 1:
+        return _object_series([clean_text(v) for v in values], series.index)
+    column = _collapsed_lines(_normalized_newlines(column))
+    return _object_series([cell.strip() for cell in column.split(_CELL_SEP)], series.index)
+
+
+def _keep_latvian_line(line):
+    """clean_latvian_text's per-line filter for an already collapsed line."""
+    if len(line) <= 30 or _LATVIAN_CHARS_RE.search(line):
+        return True
+    return len(set(_WORD_RE.findall(line.lower())) & _english_markers) < 2
+
+
+def clean_latvian_text_series(series):
+    """Batched clean_latvian_text: the newline, TAB-prefix and whitespace
+    rules run over the whole column at once; only the English-prose line
+    filter is left per line."""
+    values = _column_values(series)
+    column = _CELL_SEP.join(values)
+    if not values or column.count(_CELL_SEP) != len(values) - 1:
+        return _object_series([clean_latvian_text(v) for v in values], series.index)
+    column = _normalized_newlines(column)
+    if "\t" in column:
+        column = _TAB_PREFIX_RE.sub("", column)
+    column = _EMPTY_LINES_RE.sub("\n", _collapsed_lines(column))
+    cleaned = []
+    for cell in column.split(_CELL_SEP):
+        cell = cell.strip()
+        if "\n" not in cell:
+            cleaned.append(cell if _keep_latvian_line(cell) else "")
+            continue
+        lines = [line for line in cell.split("\n") if line and _keep_latvian_line(line)]
+        cleaned.append("\n".join(lines).strip())
+    return _object_series(cleaned, series.index)
+
+
 # Extra language columns supported if present in the xlsx (none exist yet;
 # must not break when absent).
 EXTRA_LANG_COLUMNS = {
@@ -127,39 +437,245 @@ EXTRA_LANG_COLUMNS = {
 }
 
 
-def load_bhajan_data(xlsx_path):
-    """Load and process bhajan data from Excel file. Mirrors generate_html.py."""
-    df = pd.read_excel(xlsx_path, sheet_name="Lapa1")
+def _clean_column(latvian, values):
+    """Process-pool worker: clean one column's values, return them as a list."""
+    import pandas as pd
+
+    series = pd.Series(values, dtype=object)
+    cleaner = clean_latvian_text_series if latvian else clean_text_series
+    return cleaner(series).tolist()
+
+
+def clean_columns(df, columns, jobs=1):
+    """Clean `columns` of df in place (Latvian with the Latvian cleaner).
+
+    With jobs > 1 the columns are cleaned concurrently in a process pool:
+    each worker receives only its own column's values and returns the
+    cleaned list. Results are assigned back in `columns` order, so output
+    does not depend on which worker finishes first.
+    """
+    tasks = [(col, col == "Latvian") for col in columns]
+    if jobs <= 1 or len(tasks) <= 1:
+        for col, latvian in tasks:
+            cleaner = clean_latvian_text_series if latvian else clean_text_series
+            df[col] = cleaner(df[col])
+        return df
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        futures = [pool.submit(_clean_column, latvian, df[col].tolist())
+                   for col, latvian in tasks]
+        for (col, _), future in zip(tasks, futures):
+            df[col] = future.result()
+    return df
+
 
-    # Clean critical columns, drop rows missing them
-    df = df.dropna(subset=["Bhajan_Title", "Author", "Category"])
+def load_bhajan_data(xlsx_path, jobs=1):
+    """Load and process bhajan data from Excel file. Mirrors generate_html.py.
 
-    base_text_cols = ["Original", "English", "Russian", "Latvian"]
-    present_extra_cols = [c for c in EXTRA_LANG_COLUMNS if c in df.columns]
+    jobs > 1 cleans the text columns in a process pool (see clean_columns).
+    """
+    with profile_phase("xlsx read (pandas)"):
+        import pandas as pd
+
+        df = pd.read_excel(xlsx_path, sheet_name="Lapa1")
+
+        # Clean critical columns, drop rows missing them
+        df = df.dropna(subset=["Bhajan_Title", "Author", "Category"])
+
+        base_text_cols = ["Original", "English", "Russian", "Latvian"]
+        present_extra_cols = [c for c in EXTRA_LANG_COLUMNS if c in df.columns]
 
-    # Fill missing text fields
-    for col in base_text_cols + present_extra_cols:
-        df[col] = df[col].fillna("")
-    for col in base_text_cols + present_extra_cols:
-        if col not in df.columns:
-            df[col] = ""
+        # Fill missing text fields
+        for col in base_text_cols + present_extra_cols:
+            df[col] = df[col].fillna("")
+        for col in base_text_cols + present_extra_cols:
+            if col not in df.columns:
+                df[col] = ""
 
     # Clean all text columns (Latvian gets special cleaner to strip embedded English)
-    for col in ["Original", "English", "Russian", "Bhajan_Title", "Author", "Category"] + present_extra_cols:
-        df[col] = df[col].apply(clean_text)
-    df["Latvian"] = df["Latvian"].apply(clean_latvian_text)
+    with profile_phase("cleaning"):
+        clean_columns(
+            df,
+            ["Original", "English", "Russian", "Bhajan_Title", "Author", "Category"]
+            + present_extra_cols + ["Latvian"],
+            jobs=jobs,
+        )
+
+    with profile_phase("grouping"):
+        # Ensure Verse_Number is numeric
+        df["Verse_Number"] = pd.to_numeric(df["Verse_Number"], errors="coerce")
+        df = df.dropna(subset=["Verse_Number"])
+        df["Verse_Number"] = df["Verse_Number"].astype(int)
+
+        return assemble_bhajans(df, present_extra_cols)
+
+
+def assemble_bhajans(df, present_extra_cols):
+    """Group cleaned rows into the BHAJANS structure, column-wise.
+
+    One stable sort on (first appearance of Bhajan_Title, Verse_Number)
+    puts every bhajan's rows next to each other in final verse order; the
+    groups are then sliced out of plain per-column lists at the title
+    boundaries. Equivalent to the old iterrows loop + per-bhajan verse
+    sort: title order is first-appearance order, author/category come from
+    a bhajan's first row, and equal verse numbers keep their sheet order.
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = df[(df["Bhajan_Title"] != "") & (df["Author"] != "") & (df["Category"] != "")]
+    if df.empty:
+        return []
+
+    title_codes, _ = pd.factorize(df["Bhajan_Title"])
+    numbers = df["Verse_Number"].to_numpy()
+    first_rows = np.unique(title_codes, return_index=True)[1]
+    order = np.lexsort((numbers, title_codes))
+    boundaries = np.flatnonzero(np.diff(title_codes[order])) + 1
+    starts = np.concatenate(([0], boundaries)).tolist()
+    ends = np.concatenate((boundaries, [len(order)])).tolist()
+
+    titles = df["Bhajan_Title"].tolist()
+    authors = df["Author"].tolist()
+    categories = df["Category"].tolist()
+    verse_fields = [("number", df["Verse_Number"].to_numpy()[order].tolist())]
+    verse_fields += [
+        (key, df[col].to_numpy()[order].tolist())
+        for col, key in [("Original", "original"), ("English", "english"),
+                         ("Russian", "russian"), ("Latvian", "latvian")]
+    ]
+    verse_fields += [
+        (EXTRA_LANG_COLUMNS[col], df[col].to_numpy()[order].tolist())
+        for col in present_extra_cols
+    ]
+    keys = [key for key, _ in verse_fields]
+    rows = list(zip(*(values for _, values in verse_fields)))
+
+    result = []
+    for first_row, start, end in zip(first_rows.tolist(), starts, ends):
+        result.append({
+            "title": titles[first_row],
+            "author": authors[first_row],
+            "category": categories[first_row],
+            "verses": [dict(zip(keys, row)) for row in rows[start:end]],
+        })
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Streaming ingestion (openpyxl read-only, no DataFrame)
+# ---------------------------------------------------------------------------
+
+# Strings pandas.read_excel treats as NaN by default (pandas STR_NA_VALUES).
+# Cells holding one of these are "missing" on the pandas path, so the
+# streaming path must treat them the same way to stay output-identical.
+_PANDAS_NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+})
+
+REQUIRED_COLUMNS = ["Bhajan_Title", "Author", "Category", "Verse_Number",
+                    "Original", "English", "Russian", "Latvian"]
+
 
-    # Ensure Verse_Number is numeric
-    df["Verse_Number"] = pd.to_numeric(df["Verse_Number"], errors="coerce")
-    df = df.dropna(subset=["Verse_Number"])
-    df["Verse_Number"] = df["Verse_Number"].astype(int)
+def _convert_cell(value):
+    """Normalize a raw openpyxl cell value the way pandas' openpyxl reader does.
 
-    # Group by bhajan title
+    Returns None for anything pandas would read as NaN; integral floats come
+    back as int (pandas reads 2.0 as 2, so str() of it is "2", not "2.0").
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return None if value in _PANDAS_NA_STRINGS else value
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def _coerce_verse_number(value):
+    """pd.to_numeric(errors="coerce") + astype(int) for a single cell."""
+    if value is None or isinstance(value, bool):
+        return None if value is None else int(value)
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        number = float(str(value).strip())
+    except ValueError:
+        return None
+    if number != number:
+        return None
+    return int(number)
+
+
+def iter_sheet_rows(xlsx_path, sheet_name="Lapa1"):
+    """Stream the sheet as (header, row_values) pairs with openpyxl read-only.
+
+    Only one row is materialized at a time; the workbook is closed when the
+    generator is exhausted.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(xlsx_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb[sheet_name]
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = ["" if h is None else str(h) for h in header]
+        for row in rows:
+            yield header, row
+    finally:
+        wb.close()
+
+
+def load_bhajan_data_streaming(xlsx_path, jobs=1):
+    """Streaming equivalent of load_bhajan_data (openpyxl, no pandas DataFrame).
+
+    Rows are cleaned and grouped one at a time as they come off the sheet, so
+    memory is bounded by the output structure rather than by a DataFrame of
+    the whole workbook. Output is identical to the pandas path. `jobs` is
+    accepted for interface parity with load_bhajan_data and ignored.
+    """
+    with profile_phase("xlsx read + clean + group (streaming)"):
+        return _load_bhajan_data_streaming(xlsx_path)
+
+
+def _load_bhajan_data_streaming(xlsx_path):
     bhajans = {}
-    for _, row in df.iterrows():
-        title = row["Bhajan_Title"]
-        author = row["Author"]
-        category = row["Category"]
+    columns = None
+    present_extra_cols = []
+    for header, row in iter_sheet_rows(xlsx_path):
+        if columns is None:
+            columns = {}
+            for idx, name in enumerate(header):
+                columns.setdefault(name, idx)
+            missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+            if missing:
+                raise SystemExit(f"ERROR: {xlsx_path} sheet Lapa1 missing column(s): {', '.join(missing)}")
+            present_extra_cols = [c for c in EXTRA_LANG_COLUMNS if c in columns]
+
+        def cell(col):
+            idx = columns[col]
+            return _convert_cell(row[idx]) if idx < len(row) else None
+
+        raw_title, raw_author, raw_category = cell("Bhajan_Title"), cell("Author"), cell("Category")
+        if raw_title is None or raw_author is None or raw_category is None:
+            continue
+        number = _coerce_verse_number(cell("Verse_Number"))
+        if number is None:
+            continue
+        title = clean_text(raw_title)
+        author = clean_text(raw_author)
+        category = clean_text(raw_category)
         if not title or not author or not category:
             continue
         if title not in bhajans:
@@ -170,23 +686,81 @@ def load_bhajan_data(xlsx_path):
                 "verses": [],
             }
         verse = {
-            "number": int(row["Verse_Number"]),
-            "original": row["Original"],
-            "english": row["English"],
-            "russian": row.get("Russian", ""),
-            "latvian": row.get("Latvian", ""),
+            "number": number,
+            "original": clean_text(cell("Original")),
+            "english": clean_text(cell("English")),
+            "russian": clean_text(cell("Russian")),
+            "latvian": clean_latvian_text(cell("Latvian")),
         }
-        for col, key in EXTRA_LANG_COLUMNS.items():
-            if col in present_extra_cols:
-                verse[key] = row.get(col, "")
+        for col in present_extra_cols:
+            verse[EXTRA_LANG_COLUMNS[col]] = clean_text(cell(col))
         bhajans[title]["verses"].append(verse)
 
-    # Sort verses
     for title in bhajans:
         bhajans[title]["verses"].sort(key=lambda x: x["number"])
 
-    result = [b for b in bhajans.values() if b["verses"]]
-    return result
+    return [b for b in bhajans.values() if b["verses"]]
+
+
+INGEST_ENGINES = {
+    "pandas": load_bhajan_data,
+    "openpyxl": load_bhajan_data_streaming,
+}
+
+
+# ---------------------------------------------------------------------------
+# Content-addressed ingest cache
+# ---------------------------------------------------------------------------
+
+INGEST_CACHE_DIR = REPO_ROOT / ".cache" / "ingest"
+
+
+def file_sha256(path, bufsize=1 << 20):
+    """sha256 hex digest of a file, read in fixed-size chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(bufsize), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def ingest_cache_key(xlsx_path):
+    """Cache key: content hash of the workbook + the cleaning rules version."""
+    return f"{file_sha256(xlsx_path)}-r{CLEANING_RULES_VERSION}"
+
+
+def load_bhajan_data_cached(xlsx_path, engine="pandas", cache_dir=INGEST_CACHE_DIR, jobs=1):
+    """Return (bhajans, cache_hit) for xlsx_path, reusing a previous ingest.
+
+    The cleaned bhajan list is stored as JSON under cache_dir, named by
+    ingest_cache_key(). A hit skips the workbook parse (and the pandas
+    import) entirely; a miss runs the selected engine and replaces any
+    older cache entries. Unreadable cache files are treated as misses.
+    """
+    with profile_phase("ingest cache lookup"):
+        key = ingest_cache_key(xlsx_path)
+        cache_path = cache_dir / f"{key}.json"
+        cached = None
+        if cache_path.exists():
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                cached = None
+    if isinstance(cached, dict) and cached.get("key") == key and "bhajans" in cached:
+        return cached["bhajans"], True
+
+    bhajans = INGEST_ENGINES[engine](xlsx_path, jobs=jobs)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"key": key, "bhajans": bhajans}, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+    for stale in cache_dir.glob("*.json"):
+        if stale != cache_path:
+            stale.unlink()
+    return bhajans, False
 
 
 # ---------------------------------------------------------------------------
@@ -222,7 +796,48 @@ def load_youtube_map(youtube_map_path):
 # ---------------------------------------------------------------------------
 
 
-def compute_audio_assets(audio_ids):
+AUDIO_HASH_CACHE_PATH = REPO_ROOT / ".cache" / "audio-hashes.json"
+
+
+def load_hash_cache(cache_path):
+    """Read the sidecar hash cache: {rel_path: {"stat": [size, mtime_ns, inode],
+    "sha256": hex}}. A missing or unreadable file is an empty cache."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_hash_cache(cache_path, cache):
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def file_stat_stamp(full_path):
+    """(size, mtime_ns, inode) -- the key a cached hash is valid for."""
+    st = full_path.stat()
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def cached_file_sha256(full_path, rel_path, cache):
+    """Return (sha256, size) for full_path, reusing cache[rel_path] when the
+    file's stat stamp is unchanged; otherwise hash it in fixed-size chunks
+    and update the cache entry."""
+    stamp = file_stat_stamp(full_path)
+    entry = cache.get(rel_path)
+    if isinstance(entry, dict) and entry.get("stat") == stamp and entry.get("sha256"):
+        return entry["sha256"], stamp[0]
+    digest = file_sha256(full_path)
+    cache[rel_path] = {"stat": stamp, "sha256": digest}
+    return digest, stamp[0]
+
+
+def compute_audio_assets(audio_ids, hash_cache_path=AUDIO_HASH_CACHE_PATH, max_workers=None):
     """De-duplicate + hash the audio files referenced by AUDIO_IDS.
 
     Returns (versioned_audio_ids, assets):
@@ -233,25 +848,48 @@ def compute_audio_assets(audio_ids):
         {"url": <versioned url, matches audio_ids values>, "hash": <full
         sha256>, "size": <bytes>} - this is what ships in asset-list.json and
         what DOWNLOAD_ASSETS/PRUNE operate on.
+
+    Hashes are reused from the sidecar cache at hash_cache_path while a
+    file's (size, mtime_ns, inode) is unchanged, so unchanged recordings
+    are never re-read; pass hash_cache_path=None to hash everything. Misses
+    are hashed in a thread pool of max_workers threads (executor default).
     """
-    versioned = {}
+    old_cache = load_hash_cache(hash_cache_path) if hash_cache_path else {}
+    cache = dict(old_cache)
+
+    present = set()
+    for path in dict.fromkeys(audio_ids.values()):
+        if (REPO_ROOT / path).exists():
+            present.add(path)
+        else:
+            print(f"WARNING: audio asset referenced but missing on disk: {path}")
+
+    # Hash the de-duplicated path set concurrently: hashlib releases the GIL
+    # while digesting each 1 MiB chunk, so cold builds are bounded by disk
+    # bandwidth rather than one core. Each worker only writes its own path's
+    # cache entry.
+    unique_paths = sorted(present)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        digests = list(pool.map(
+            lambda path: cached_file_sha256(REPO_ROOT / path, path, cache), unique_paths
+        ))
     by_path = {}
+    for path, (digest, size) in zip(unique_paths, digests):
+        by_path[path] = {
+            "url": f"{path}?v={digest[:8]}",
+            "hash": digest,
+            "size": size,
+        }
+
+    versioned = {}
     for title, path in audio_ids.items():
-        full_path = REPO_ROOT / path
-        if not full_path.exists():
-            print(f"WARNING: audio asset referenced but missing on disk: {path}")
-            versioned[title] = path
-            continue
-        if path not in by_path:
-            data = full_path.read_bytes()
-            digest = hashlib.sha256(data).hexdigest()
-            by_path[path] = {
-                "url": f"{path}?v={digest[:8]}",
-                "hash": digest,
-                "size": len(data),
-            }
-        versioned[title] = by_path[path]["url"]
+        versioned[title] = by_path[path]["url"] if path in by_path else path
     assets = [by_path[p] for p in sorted(by_path.keys())]
+    if hash_cache_path:
+        # Keep only files still referenced, so the sidecar doesn't grow forever.
+        cache = {p: e for p, e in cache.items() if p in by_path}
+        if cache != old_cache:
+            save_hash_cache(hash_cache_path, cache)
     return versioned, assets
 
 
@@ -260,13 +898,14 @@ def compute_audio_assets(audio_ids):
 # ---------------------------------------------------------------------------
 
 
-def enumerate_shell_assets():
-    """Shell precache list: page shell + manifest + icons + self-hosted fonts.
+def enumerate_shell_assets(extra=()):
+    """Shell precache list: page shell + manifest + `extra` (the search
+    worker, with --search-worker) + icons + self-hosted fonts.
 
     Deliberately excludes audio/*.ogg (media-v1 territory, never precached)
     and data/asset-list.json/version.json (fetched no-store by the page).
     """
-    assets = ["./", "index.html", "manifest.json"]
+    assets = ["./", "index.html", "manifest.json", *extra]
     icons_dir = REPO_ROOT / "icons"
     if icons_dir.exists():
         for p in sorted(icons_dir.iterdir()):
@@ -279,15 +918,63 @@ def enumerate_shell_assets():
     return assets
 
 
-def build_service_worker(version, sw_template_path, out_path):
+def build_service_worker(version, sw_template_path, out_path, extra_assets=()):
     template = sw_template_path.read_text(encoding="utf-8")
-    shell_assets = enumerate_shell_assets()
+    shell_assets = enumerate_shell_assets(extra_assets)
     out_text = template.replace("{{SW_VERSION}}", str(version))
     out_text = out_text.replace(
         "{{SHELL_ASSETS}}", json.dumps(shell_assets, ensure_ascii=False)
     )
-    out_path.write_text(out_text, encoding="utf-8", newline="")
-    return shell_assets
+    changed = write_if_changed(out_path, out_text)
+    return shell_assets, changed
+
+
+# --search-worker: search-worker.js is the search engine section of
+# template.html, from its first banner through its last, inside
+# tools/search_worker_template.js's message loop.
+SEARCH_WORKER_NAME = "search-worker.js"
+SEARCH_ENGINE_BEGIN = "// ---- Search (H1) ----"
+SEARCH_ENGINE_END = "// ---- End of search engine ----"
+
+
+def extract_search_engine(template_text):
+    start = template_text.find(SEARCH_ENGINE_BEGIN)
+    end = template_text.find(SEARCH_ENGINE_END, max(start, 0))
+    if start < 0 or end < 0:
+        raise SystemExit(
+            f"ERROR: template has no search engine section ({SEARCH_ENGINE_BEGIN!r} ... "
+            f"{SEARCH_ENGINE_END!r}) for --search-worker"
+        )
+    return template_text[start:end + len(SEARCH_ENGINE_END)]
+
+
+def build_search_worker(template_text, worker_template_path, out_path):
+    template = worker_template_path.read_text(encoding="utf-8")
+    # Only the placeholder's own line: the header comment names it too.
+    out_text = template.replace("\n{{SEARCH_ENGINE_JS}}\n",
+                                "\n" + extract_search_engine(template_text) + "\n", 1)
+    return write_if_changed(out_path, out_text)
+
+
+def remove_search_worker(path):
+    """Delete a search worker (and its --compress siblings) left over from
+    an earlier --search-worker build."""
+    for stale in (path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")):
+        if stale.exists():
+            stale.unlink()
+
+
+def search_cache_key(version, template_text, bhajans):
+    """--persist-search: "<version>-<hash8>" naming the indexes the page
+    keeps in IndexedDB. The hash covers the search code and the text the
+    page's own scan index is built from, so a rebuild that changes either
+    without a --bump still retires the old copies (the prebuilt indexes are
+    persisted under their content-hashed URLs anyway)."""
+    h = hashlib.sha256(extract_search_engine(template_text).encode("utf-8"))
+    for b in bhajans:
+        h.update(json.dumps([b["title"], b["author"], [v.get("original") for v in b["verses"]]],
+                            ensure_ascii=False).encode("utf-8"))
+    return f"{version}-{h.hexdigest()[:8]}"
 
 
 def resolve_version(explicit_version, bump):
@@ -307,52 +994,1158 @@ def resolve_version(explicit_version, bump):
     return existing
 
 
+# ---------------------------------------------------------------------------
+# Content layout (--split-languages / --lazy-verses)
+# ---------------------------------------------------------------------------
+
+# Out-of-line content files are written to <out dir>/content/ and named
+# <group>[-<bucket>].<sha256[:8]>.json, so a URL never changes meaning and
+# the service worker can cache them forever (content-v1).
+CONTENT_DIRNAME = "content"
+CONTENT_FILE_RE = re.compile(r"^([a-z]+(?:-[a-z]+)?(?:-\d+)?\.[0-9a-f]{8}\.json)(?:\.gz|\.br)?$")
+VERSE_CORE_KEYS = ("number", "original")
+DEFAULT_BUCKET_SIZE = 32
+
+
+def translation_fields(bhajans):
+    """Verse translation keys present in bhajans, in first-seen order."""
+    fields = {}
+    for b in bhajans:
+        for v in b["verses"]:
+            for key in v:
+                if key not in VERSE_CORE_KEYS:
+                    fields.setdefault(key)
+    return list(fields)
+
+
+def content_file_name(group, text):
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{group}.{digest[:8]}.json"
+
+
+def first_line_of(b):
+    """Python twin of firstLineOf in template.html."""
+    verses = b["verses"]
+    return verses[0]["original"].split("\n")[0] if verses and verses[0].get("original") else ""
+
+
+def catalog_entry(b):
+    """Inline stand-in for a bhajan whose verses live in a chunk file: what
+    the list views, search and the bhajan header need without the verses
+    (audio and video availability the page reads from AUDIO_IDS and
+    YOUTUBE_IDS, inline either way)."""
+    entry = {k: v for k, v in b.items() if k != "verses"}
+    entry.update(firstLine=first_line_of(b), verseCount=len(b["verses"]))
+    return entry
+
+
+def layout_content(bhajans, split_languages=False, lazy_verses=False,
+                   bucket_size=DEFAULT_BUCKET_SIZE):
+    """Split bhajans into the inline BHAJANS value and out-of-line files.
+
+    Returns (inline_bhajans, content_files, files): content_files is the
+    CONTENT_FILES literal injected into the page ({} when everything stays
+    inline) and files maps content/<name> to its JSON text.
+
+    Files hold consecutive runs ("buckets") of bucket_size bhajans, or the
+    whole book in one bucket without lazy_verses; each is a list with one
+    entry per bhajan of its bucket:
+      - lazy_verses: BHAJANS becomes a catalog (see catalog_entry) and
+        verses-<k> holds each bhajan's verse objects;
+      - split_languages: verse objects keep only number + original and
+        <language>-<k> holds each bhajan's text per verse in that language.
+    """
+    if not (split_languages or lazy_verses):
+        return bhajans, {}, {}
+    if not lazy_verses:
+        bucket_size = 0
+    elif bucket_size < 1:
+        raise SystemExit(f"ERROR: --bucket-size must be at least 1 (got {bucket_size})")
+    fields = translation_fields(bhajans) if split_languages else []
+
+    def core_verses(b):
+        if not split_languages:
+            return b["verses"]
+        return [{k: v[k] for k in VERSE_CORE_KEYS if k in v} for v in b["verses"]]
+
+    if lazy_verses:
+        inline = [catalog_entry(b) for b in bhajans]
+    else:
+        inline = [dict(b, verses=core_verses(b)) for b in bhajans]
+
+    buckets = [bhajans[i:i + bucket_size] for i in range(0, len(bhajans), bucket_size)] if lazy_verses else [bhajans]
+    files = {}
+    content_files = {"bucketSize": bucket_size, "verses": [],
+                     "languages": {field: [] for field in fields}}
+
+    def add_file(group, k, data, urls):
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        rel = f"{CONTENT_DIRNAME}/{content_file_name(f'{group}-{k:03d}', text)}"
+        files[rel] = text
+        urls.append(rel)
+
+    for k, bucket in enumerate(buckets):
+        if lazy_verses:
+            add_file("verses", k, [core_verses(b) for b in bucket], content_files["verses"])
+        for field in fields:
+            add_file(field, k, [[v.get(field, "") for v in b["verses"]] for b in bucket],
+                     content_files["languages"][field])
+    return inline, content_files, files
+
+
+def write_content_files(out_dir, files):
+    """Write files (relpath -> text) under out_dir and delete content files
+    (and their --compress siblings) left over from earlier builds.
+    Returns {path: changed}."""
+    content_dir = out_dir / CONTENT_DIRNAME
+    changed = {}
+    if files:
+        content_dir.mkdir(parents=True, exist_ok=True)
+    for rel, text in files.items():
+        path = out_dir / rel
+        changed[path] = write_if_changed(path, text)
+    if content_dir.is_dir():
+        for stale in content_dir.iterdir():
+            m = CONTENT_FILE_RE.match(stale.name)
+            if m and content_dir / m.group(1) not in changed:
+                stale.unlink()
+    return changed
+
+
+# ---------------------------------------------------------------------------
+# Prebuilt search index (--search-index)
+# ---------------------------------------------------------------------------
+
+# Postings are keyed by (bhajan, field) for these fields; verse text gets
+# one key per verse, numbered after them (code len(SEARCH_FIELDS) + n is
+# the n-th verse of b["verses"]).
+SEARCH_INDEX_FORMAT = "search-1"
+SEARCH_FIELDS = ("title", "author", "firstLine")
+# Same marks normalizeSearch strips in the page.
+_COMBINING_MARKS_RE = re.compile("[\u0300-\u036f]")
+# [^\W_] is exactly the page's [\p{L}\p{N}]: letters and numbers.
+_SEARCH_TOKEN_RE = re.compile(r"[^\W_]+")
+# Per-language indexes cover one translation field's verse text each and
+# fold it for that language (see fold_search); "latin" unless listed.
+SEARCH_LANGUAGE_FOLDS = {"russian": "cyrillic"}
+_SOFT_HYPHEN = "\u00ad"
+_NOT_SHORT_I_RE = re.compile("[^\u0439]+")
+
+
+def normalize_search(text):
+    """Python twin of normalizeSearch in template.html: NFD, combining
+    marks stripped, lowercased ("Kṛṣṇa" -> "krsna")."""
+    if not text:
+        return ""
+    return _COMBINING_MARKS_RE.sub("", unicodedata.normalize("NFD", text)).lower()
+
+
+def fold_search(text, fold="original"):
+    """Python twin of foldSearch in template.html.
+
+    "original" is normalize_search. "latin" also drops soft hyphens and
+    spells out the ligatures œ/æ (French). "cyrillic" drops soft hyphens
+    and lowercases, then strips marks everywhere except in й, which is a
+    letter of its own in Russian (ё still folds to е).
+    """
+    if not text:
+        return ""
+    if fold == "cyrillic":
+        text = unicodedata.normalize("NFC", text.replace(_SOFT_HYPHEN, "")).lower()
+        return _NOT_SHORT_I_RE.sub(lambda m: normalize_search(m.group()), text)
+    if fold == "latin":
+        return normalize_search(text.replace(_SOFT_HYPHEN, "")).replace("œ", "oe").replace("æ", "ae")
+    return normalize_search(text)
+
+
+def search_tokens(text, fold="original"):
+    """Python twin of searchTokens in template.html."""
+    return _SEARCH_TOKEN_RE.findall(fold_search(text, fold))
+
+
+def utf16_len(text):
+    return len(text.encode("utf-16-le")) // 2
+
+
+def search_token_spans(text, fold="original"):
+    """(token, UTF-16 offset in the folded text) for each search token."""
+    folded = fold_search(text, fold)
+    astral = folded and max(folded) > "\uffff"
+    for m in _SEARCH_TOKEN_RE.finditer(folded):
+        yield m.group(), utf16_len(folded[:m.start()]) if astral else m.start()
+
+
+def build_search_index(bhajans, language=None, positions=False, frequencies=False):
+    """Token inverted index over bhajans (the full, pre-layout list; ids
+    are positions in it and so in BHAJANS).
+
+    Without `language` it covers SEARCH_FIELDS plus each verse's original
+    text, folded like the page's normalizeSearch; with a translation field
+    it covers only that field's verse text, folded for that language.
+
+    Returns {"format", "fold", "fields", "terms", "postings"}: terms are
+    sorted in JS string order (UTF-16 code units) so the page can
+    binary-search prefixes, and postings[i] lists term i's hits as a flat
+    [bhajan delta, code, ...] run sorted by (bhajan, code), where code
+    indexes fields or is len(fields) + verse position. With `positions`
+    (--snippets) each entry also has offset, where the term first starts
+    in that field's folded text (UTF-16), and the index says
+    "positions": true. With `frequencies` (--bm25) each entry ends in the
+    term's number of occurrences there, and the index says
+    "frequencies": true and adds the BM25 length statistics: "lengths",
+    per bhajan the word count of each code (its fields, then each verse),
+    and "avgLengths", the mean word count of each field over the bhajans
+    followed by that of a verse over all verses.
+    """
+    fields = [] if language else list(SEARCH_FIELDS)
+    fold = SEARCH_LANGUAGE_FOLDS.get(language, "latin") if language else "original"
+    hits = {}
+    lengths = []
+    for bid, b in enumerate(bhajans):
+        texts = [b["title"], b["author"], first_line_of(b)] if not language else []
+        texts += [v.get(language or "original", "") for v in b["verses"]]
+        counts = [0] * len(texts)
+        for code, text in enumerate(texts):
+            for token, offset in search_token_spans(text, fold):
+                entry = hits.setdefault(token, {}).setdefault((bid, code), [offset, 0])
+                entry[1] += 1
+                counts[code] += 1
+        lengths.append(counts)
+    terms = sorted(hits, key=lambda term: term.encode("utf-16-be"))
+    postings = []
+    for term in terms:
+        flat, prev = [], 0
+        for (bid, code), (offset, count) in sorted(hits[term].items()):
+            flat += [bid - prev, code]
+            if positions:
+                flat.append(offset)
+            if frequencies:
+                flat.append(count)
+            prev = bid
+        postings.append(flat)
+    index = {"format": SEARCH_INDEX_FORMAT, "fold": fold, "fields": fields,
+             "terms": terms, "postings": postings}
+    if positions:
+        index["positions"] = True
+    if frequencies:
+        verse_lengths = [n for counts in lengths for n in counts[len(fields):]]
+        index["frequencies"] = True
+        index["lengths"] = lengths
+        index["avgLengths"] = [round(sum(counts[i] for counts in lengths) / max(len(lengths), 1), 4)
+                               for i in range(len(fields))]
+        index["avgLengths"].append(round(sum(verse_lengths) / max(len(verse_lengths), 1), 4))
+    return index
+
+
+def search_index_files(bhajans, positions=False, frequencies=False):
+    """Prebuilt indexes: the main one plus one per translation field.
+
+    Returns (entries, files): entries is what CONTENT_FILES gains
+    ({"search": rel, "searchLanguages": {field: rel}}) and files maps
+    content/search[-<field>].<hash8>.json to its JSON text.
+    """
+    files = {}
+
+    def add_file(group, index):
+        text = json.dumps(index, ensure_ascii=False, separators=(",", ":"))
+        rel = f"{CONTENT_DIRNAME}/{content_file_name(group, text)}"
+        files[rel] = text
+        return rel
+
+    entries = {
+        "search": add_file("search", build_search_index(bhajans, positions=positions,
+                                                         frequencies=frequencies)),
+        "searchLanguages": {field: add_file(f"search-{field}",
+                                            build_search_index(bhajans, field, positions,
+                                                               frequencies))
+                            for field in translation_fields(bhajans)},
+    }
+    return entries, files
+
+
+# BM25 parameters and field boosts (--bm25), as in the page's scoreBm25.
+# Each field, and each verse on its own (against the mean verse length),
+# scores a query word boost * tf * (k1 + 1) / (tf + k1 * norm), norm being
+# 1 - b + b * length / mean length; a word's verse score is its best
+# verse's. However often a word occurs, a verse thus adds at most
+# (k1 + 1) = 2.2 times its boost. Once in a title of L words it adds
+# 2.2 / (1 + 1.2 * (0.25 + 0.75 * L / mean)) times the title boost: 0.73
+# for the longest titles (7 words, mean 3.7), so a title boost of 4 (2.9)
+# puts every title match above every verse-only one. tools/
+# verify_roundtrip.py checks that on the built index (see bm25_word_scores).
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_BOOSTS = {"title": 4, "author": 1.5, "firstLine": 2, "verseText": 1}
+
+
+def bm25_word_scores(index, token):
+    """Python twin of one query word's share of scoreBm25 in template.html,
+    on an index built with frequencies: bhajan id -> its scores per field
+    (index["fields"], then "verseText" for the best verse) for the words
+    starting with token, idf included."""
+    fields = index["fields"] + ["verseText"]
+    verses = len(index["fields"])
+    stride = 3 + bool(index.get("positions"))
+    terms = index["terms"]
+    start = bisect.bisect_left(terms, token.encode("utf-16-be"),
+                               key=lambda term: term.encode("utf-16-be"))
+    counts = {}  # (bhajan, code) -> occurrences
+    for i in range(start, len(terms)):
+        if not terms[i].startswith(token):
+            break
+        run, bid = index["postings"][i], 0
+        for j in range(0, len(run), stride):
+            bid += run[j]
+            key = (bid, run[j + 1])
+            counts[key] = counts.get(key, 0) + run[j + stride - 1]
+    matched = {bid for bid, _ in counts}
+    total = len(index["lengths"])
+    idf = math.log(1 + (total - len(matched) + 0.5) / (len(matched) + 0.5))
+    scores = {bid: [0.0] * len(fields) for bid in matched}
+    for (bid, code), tf in counts.items():
+        slot = min(code, verses)
+        avg = index["avgLengths"][slot]
+        norm = 1 - BM25_B + BM25_B * index["lengths"][bid][code] / avg if avg else 1
+        score = idf * BM25_BOOSTS[fields[slot]] * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+        scores[bid][slot] = max(scores[bid][slot], score)
+    return scores
+
+
+# ---------------------------------------------------------------------------
+# Fuzzy search index (--fuzzy-index)
+# ---------------------------------------------------------------------------
+
+FUZZY_INDEX_FORMAT = "fuzzy-1"
+# Field bits of a fuzzy posting, as SEARCH_FIELD_BITS in the page; every
+# verse is "verseText".
+FUZZY_FIELD_BITS = {"title": 1, "author": 2, "firstLine": 4, "verseText": 8}
+# Romanizations of the same Bengali/Sanskrit word differ in these (on text
+# already folded by normalize_search, so ô/ĵ/ś/ṣ are o/j/s/s here): the
+# inherent vowel is written o or a, ĵ also as j or y, v also as b, ś/ṣ
+# also as sh; long vowels are often doubled instead of marked.
+_PHONETIC_MAP = str.maketrans({"o": "a", "y": "j", "v": "b"})
+_DOUBLED_VOWEL_RE = re.compile(r"([aeiu])\1+")
+
+
+def phonetic_key(token):
+    """Python twin of phoneticKey in template.html: the spelling-tolerant
+    key of a search token ("gouranga" and "gaurāṅga" -> "gauranga")."""
+    return _DOUBLED_VOWEL_RE.sub(r"\1", token.replace("sh", "s").translate(_PHONETIC_MAP))
+
+
+def key_bigrams(key):
+    """Distinct bigrams of ^key$ (the page's keyBigrams)."""
+    padded = f"^{key}$"
+    return sorted({padded[i:i + 2] for i in range(len(padded) - 1)})
+
+
+def build_fuzzy_index(bhajans):
+    """Bigram index over the phonetic keys of every word the main search
+    index covers, for matches within a small edit distance.
+
+    Returns {"format", "keys", "postings", "grams"}: keys are the distinct
+    phonetic keys in JS string order; postings[i] is key i's flat
+    [bhajan delta, field bits, ...] run (FUZZY_FIELD_BITS, one pair per
+    bhajan); grams maps each bigram of ^key$ to the delta-coded ids of the
+    keys containing it. The page keeps keys sharing enough bigrams with the
+    query's (the q-gram lemma) and checks their edit distance exactly.
+    """
+    hits = {}
+    for bid, b in enumerate(bhajans):
+        fields = [("title", b["title"]), ("author", b["author"]), ("firstLine", first_line_of(b))]
+        fields += [("verseText", v.get("original", "")) for v in b["verses"]]
+        for field, text in fields:
+            for token in search_tokens(text):
+                per_bhajan = hits.setdefault(phonetic_key(token), {})
+                per_bhajan[bid] = per_bhajan.get(bid, 0) | FUZZY_FIELD_BITS[field]
+    keys = sorted(hits, key=lambda key: key.encode("utf-16-be"))
+    postings, grams = [], {}
+    for kid, key in enumerate(keys):
+        flat, prev = [], 0
+        for bid, bits in sorted(hits[key].items()):
+            flat += [bid - prev, bits]
+            prev = bid
+        postings.append(flat)
+        for gram in key_bigrams(key):
+            grams.setdefault(gram, []).append(kid)
+    for gram, ids in grams.items():
+        grams[gram] = [kid - prev for kid, prev in zip(ids, [0] + ids[:-1])]
+    return {"format": FUZZY_INDEX_FORMAT, "keys": keys, "postings": postings,
+            "grams": dict(sorted(grams.items()))}
+
+
+def fuzzy_index_file(bhajans):
+    """(content/fuzzy.<hash8>.json, text) for the fuzzy index."""
+    text = json.dumps(build_fuzzy_index(bhajans), ensure_ascii=False, separators=(",", ":"))
+    return f"{CONTENT_DIRNAME}/{content_file_name('fuzzy', text)}", text
+
+
+# ---------------------------------------------------------------------------
+# Substring index (--substring-index)
+# ---------------------------------------------------------------------------
+
+SUBSTRING_INDEX_FORMAT = "substring-1"
+
+
+def substring_segments(b):
+    """(title, verse text, first-line length) normalized exactly like the
+    page's buildSearchIndex entries; the first line is a prefix of the
+    verse text, so it needs no text of its own."""
+    verse_text = normalize_search(" \n ".join(v.get("original") or "" for v in b["verses"]))
+    first_line = normalize_search(first_line_of(b))
+    if not verse_text.startswith(first_line):
+        raise SystemExit(f"ERROR: [{b['title']}] first line is not a prefix of its verse text")
+    return normalize_search(b["title"]), verse_text, first_line
+
+
+def suffix_array(units):
+    """Suffix array of a numpy code-unit array by prefix doubling: each
+    round sorts suffixes by their first 2k units as (rank of the first k,
+    rank of the next k) pairs, until every rank is distinct. A suffix that
+    is a prefix of another sorts first, as in JS string comparison."""
+    import numpy as np
+
+    n = len(units)
+    rank = units.astype(np.int64)
+    sa = np.argsort(rank, kind="stable")
+    k = 1
+    while n:
+        second = np.full(n, -1, dtype=np.int64)
+        if k < n:
+            second[:n - k] = rank[k:]
+        sa = np.lexsort((second, rank))
+        first_sorted, second_sorted = rank[sa], second[sa]
+        new_group = np.ones(n, dtype=np.int64)
+        new_group[1:] = (first_sorted[1:] != first_sorted[:-1]) | (second_sorted[1:] != second_sorted[:-1])
+        rank = np.empty(n, dtype=np.int64)
+        rank[sa] = np.cumsum(new_group) - 1
+        if rank[sa[-1]] == n - 1:
+            break
+        k *= 2
+    return sa
+
+
+def build_substring_index(bhajans):
+    """Suffix array over every bhajan's normalized title and verse text.
+
+    The page's scan tests title / first line / verse text with includes();
+    the same answers come from binary-searching this array for the
+    suffixes that start with the query, then keeping the occurrences that
+    fit inside one of those fields. All offsets are UTF-16 code units, as
+    JS strings count them.
+
+    Returns {"format", "text", "starts", "sa"}: text is the fields
+    concatenated bhajan by bhajan (title, then verse text), starts holds
+    per bhajan [title start, verse start, first-line end], a bhajan's verse
+    text ending where the next one's title starts (or at the end of text),
+    and sa is the suffix array as little-endian uint32, base64-encoded.
+    """
+    import numpy as np
+
+    parts, starts, offset = [], [], 0
+    for b in bhajans:
+        title, verse_text, first_line = substring_segments(b)
+        title_len, first_len = (len(x.encode("utf-16-le")) // 2 for x in (title, first_line))
+        starts += [offset, offset + title_len, offset + title_len + first_len]
+        parts += [title, verse_text]
+        offset += title_len + len(verse_text.encode("utf-16-le")) // 2
+    text = "".join(parts)
+    units = np.frombuffer(text.encode("utf-16-le"), dtype="<u2")
+    sa = suffix_array(units).astype("<u4")
+    return {"format": SUBSTRING_INDEX_FORMAT, "text": text, "starts": starts,
+            "sa": base64.b64encode(sa.tobytes()).decode("ascii")}
+
+
+def substring_index_file(bhajans):
+    """(content/substring.<hash8>.json, text) for the suffix-array index."""
+    text = json.dumps(build_substring_index(bhajans), ensure_ascii=False, separators=(",", ":"))
+    return f"{CONTENT_DIRNAME}/{content_file_name('substring', text)}", text
+
+
+# ---------------------------------------------------------------------------
+# Search snippets (--snippets)
+# ---------------------------------------------------------------------------
+
+# The page shows the verse line a search hit is in, with the match
+# highlighted. Hits are found in folded text, so the offsets are mapped
+# back to the original through this table instead of the page re-folding
+# (or re-scanning) verse text.
+SNIPPETS_FORMAT = "snippets-1"
+
+
+# A character and the combining marks after it (the marks the folds strip);
+# fold_shifts checks that folding really is per cluster.
+_FOLD_CLUSTER_RE = re.compile("(?s).[\u0300-\u036f]*")
+
+
+def fold_shifts(text, fold, cache=None):
+    """Flat [folded offset, original offset, ...] breakpoints (UTF-16) of
+    text under fold: an offset f of the folded text is original offset
+    f + (o - f) of the last breakpoint (f, o) at or before it. Empty when
+    folding keeps every offset.
+
+    Each character is folded with the combining marks after it; raises if
+    those pieces do not add up to the fold of the whole text. `cache`
+    (cluster -> (folded, original length, folded length)) may be shared
+    between calls with the same fold.
+    """
+    if cache is None:
+        cache = {}
+    clusters = _FOLD_CLUSTER_RE.findall(text)
+    for c in set(clusters).difference(cache):
+        folded = fold_search(c, fold)
+        cache[c] = (folded, utf16_len(c), utf16_len(folded))
+    if "".join(cache[c][0] for c in clusters) != fold_search(text, fold):
+        raise SystemExit(f"ERROR: {fold!r} folding of {text[:40]!r}... is not per character")
+    if all(cache[c][1] == cache[c][2] for c in set(clusters)):
+        return []
+    shifts, f, o = [], 0, 0
+    for c in clusters:
+        f += cache[c][2]
+        o += cache[c][1]
+        if (shifts[-1] - shifts[-2] if shifts else 0) != o - f:
+            shifts += [f, o]
+    return shifts
+
+
+def build_snippet_table(bhajans):
+    """Offset table for search snippets.
+
+    Returns {"format", "folds", "lengths", "shifts"}: folds maps each
+    searchable verse field ("original" and every translation) to its fold,
+    lengths[i] lists bhajan i's original verses' folded lengths (the
+    scan and the substring index see them joined by " \n "), and
+    shifts[field]["<bhajan>.<verse>"] is fold_shifts of that verse's text,
+    present only where folding moves offsets.
+    """
+    folds = {"original": "original"}
+    folds.update((field, SEARCH_LANGUAGE_FOLDS.get(field, "latin"))
+                 for field in translation_fields(bhajans))
+    lengths = [[utf16_len(normalize_search(v.get("original") or "")) for v in b["verses"]]
+               for b in bhajans]
+    shifts = {field: {} for field in folds}
+    caches = {fold: {} for fold in folds.values()}
+    for bid, b in enumerate(bhajans):
+        for n, v in enumerate(b["verses"]):
+            for field, fold in folds.items():
+                run = fold_shifts(v.get(field) or "", fold, caches[fold])
+                if run:
+                    shifts[field][f"{bid}.{n}"] = run
+    return {"format": SNIPPETS_FORMAT, "folds": folds, "lengths": lengths, "shifts": shifts}
+
+
+def snippet_table_file(bhajans):
+    """(content/snippets.<hash8>.json, text) for the offset table."""
+    text = json.dumps(build_snippet_table(bhajans), ensure_ascii=False, separators=(",", ":"))
+    return f"{CONTENT_DIRNAME}/{content_file_name('snippets', text)}", text
+
+
+# ---------------------------------------------------------------------------
+# Autocomplete dictionary (--autocomplete)
+# ---------------------------------------------------------------------------
+
+AUTOCOMPLETE_FORMAT = "autocomplete-1"
+# Terms per front-coded block: the page binary-searches block heads, then
+# decodes at most a block's worth of terms before the first completion.
+AUTOCOMPLETE_BLOCK_SIZE = 16
+
+
+def common_prefix_len(a, b):
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+def build_autocomplete_dictionary(bhajans, block_size=AUTOCOMPLETE_BLOCK_SIZE):
+    """Front-coded dictionary of the words of SEARCH_FIELDS, folded like
+    the main search index, with their document frequencies.
+
+    Returns {"format", "fold", "blockSize", "blocks", "df"}: the terms,
+    sorted in JS string order, are cut into blocks of blockSize; a block is
+    [head, shared, suffix, shared, suffix, ...], each term after the head
+    being the first `shared` UTF-16 units of the term before it plus
+    suffix. df[i] is the number of bhajans whose title, author or first
+    line has term i.
+    """
+    df = {}
+    for b in bhajans:
+        for term in {token for text in (b["title"], b["author"], first_line_of(b))
+                     for token in search_tokens(text)}:
+            df[term] = df.get(term, 0) + 1
+    terms = sorted(df, key=lambda term: term.encode("utf-16-be"))
+    blocks = []
+    for start in range(0, len(terms), block_size):
+        block = [terms[start]]
+        for prev, term in zip(terms[start:], terms[start + 1:start + block_size]):
+            # Tokens are letters and numbers, almost all in the BMP; count
+            # the shared prefix in UTF-16 units as the page slices it.
+            shared = common_prefix_len(prev, term)
+            block += [utf16_len(term[:shared]), term[shared:]]
+        blocks.append(block)
+    return {"format": AUTOCOMPLETE_FORMAT, "fold": "original", "blockSize": block_size,
+            "blocks": blocks, "df": [df[term] for term in terms]}
+
+
+def autocomplete_file(bhajans):
+    """(content/autocomplete.<hash8>.json, text) for the dictionary."""
+    text = json.dumps(build_autocomplete_dictionary(bhajans), ensure_ascii=False, separators=(",", ":"))
+    return f"{CONTENT_DIRNAME}/{content_file_name('autocomplete', text)}", text
+
+
+# ---------------------------------------------------------------------------
+# Template rendering (streamed, atomic)
+# ---------------------------------------------------------------------------
+
+def iter_json_chunks(value):
+    """json.dumps(value, ensure_ascii=False), produced piecewise.
+
+    A top-level list is emitted one element at a time (each element still
+    goes through the C encoder), so the full multi-megabyte literal is never
+    held as one string. The concatenated chunks equal json.dumps(value).
+    """
+    if isinstance(value, list):
+        yield "["
+        for i, item in enumerate(value):
+            if i:
+                yield ", "
+            yield json.dumps(item, ensure_ascii=False)
+        yield "]"
+    else:
+        yield json.dumps(value, ensure_ascii=False)
+
+
+def split_template(template_text, slots):
+    """Locate each slot's first occurrence once; return the template as a
+    list of (literal_text, slot_or_None) segments in document order.
+    Slots missing from the template are simply not rendered."""
+    found = sorted((template_text.find(slot), slot) for slot in slots
+                   if template_text.find(slot) != -1)
+    segments = []
+    pos = 0
+    for start, slot in found:
+        segments.append((template_text[pos:start], slot))
+        pos = start + len(slot)
+    segments.append((template_text[pos:], None))
+    return segments
+
+
+def render_template(template_text, values, out_path, encoders=None):
+    """Stream template_text with each slot in `values` replaced by its JSON
+    encoding into out_path. Returns True if out_path's bytes changed.
+
+    `encoders` optionally maps a slot to a function returning that value's
+    text chunks, in place of iter_json_chunks (see --format compact).
+
+    Output goes to a temp file next to out_path which is then atomically
+    renamed over it, so a crash mid-build never leaves a half-written page.
+    If the result is byte-identical to the existing file, the temp file is
+    discarded and out_path (and its mtime) is left untouched.
+    """
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            for text, slot in split_template(template_text, values.keys()):
+                f.write(text)
+                if slot is not None:
+                    encode = (encoders or {}).get(slot, iter_json_chunks)
+                    for chunk in encode(values[slot]):
+                        f.write(chunk)
+        if out_path.exists() and file_sha256(tmp_path) == file_sha256(out_path):
+            return False
+        os.replace(tmp_path, out_path)
+        return True
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+# ---------------------------------------------------------------------------
+# Compact BHAJANS wire format (--format compact)
+# ---------------------------------------------------------------------------
+
+COMPACT_FORMAT = "compact-1"
+# Bhajan fields whose values repeat across bhajans; stored once in a string
+# table and referenced by index.
+COMPACT_INTERNED_KEYS = ("author", "category")
+DATA_FORMATS = ("json", "compact")
+
+
+def encode_compact_bhajans(bhajans):
+    """Dictionary-encode a BHAJANS list (inline, split or catalog form).
+
+    Returns [header, verses_0, verses_1, ...]: the header holds the bhajan
+    fields column by column (interned ones as indices into header["tables"])
+    plus the verse key order, and each following element is one bhajan's
+    verses as positional rows. Catalog entries without verses have no
+    following elements. decodeBhajans in template.html (and
+    tools/verify_roundtrip.decode_compact_bhajans) invert it exactly, key
+    order included.
+    """
+    keys = [k for k in bhajans[0] if k != "verses"] if bhajans else []
+    has_verses = bool(bhajans) and "verses" in bhajans[0]
+    verse_keys = next((list(v) for b in bhajans for v in b.get("verses", [])), [])
+    for b in bhajans:
+        if [k for k in b if k != "verses"] != keys or ("verses" in b) != has_verses:
+            raise SystemExit(f"ERROR: --format compact needs uniform bhajan fields; "
+                             f"[{b.get('title')}] has {list(b)}")
+        if any(list(v) != verse_keys for v in b.get("verses", [])):
+            raise SystemExit(f"ERROR: --format compact needs uniform verse fields; "
+                             f"[{b.get('title')}] differs from {verse_keys}")
+
+    tables = {}
+    columns = {}
+    for key in keys:
+        values = [b[key] for b in bhajans]
+        if key in COMPACT_INTERNED_KEYS:
+            index = {}
+            columns[key] = [index.setdefault(value, len(index)) for value in values]
+            tables[key] = list(index)
+        else:
+            columns[key] = values
+    header = {
+        "format": COMPACT_FORMAT,
+        "count": len(bhajans),
+        "keys": keys,
+        "tables": tables,
+        "columns": columns,
+        "verseKeys": verse_keys if has_verses else None,
+    }
+    rows = ([[v[k] for k in verse_keys] for v in b["verses"]] for b in bhajans) if has_verses else ()
+    return [header, *rows]
+
+
+def iter_compact_chunks(value, encode=iter_json_chunks):
+    """JS expression decoding `value` (an encode_compact_bhajans list)."""
+    yield "decodeBhajans("
+    yield from encode(value)
+    yield ")"
+
+
+# ---------------------------------------------------------------------------
+# JSON.parse string-literal emission (--json-parse)
+# ---------------------------------------------------------------------------
+
+# Backslash first, so the escapes added after it are not doubled. "<" is
+# escaped so no "</script>" can ever appear inside the inline <script>;
+# U+2028/U+2029 are line terminators in pre-ES2019 string literals.
+_JS_STRING_ESCAPES = [
+    ("\\", "\\\\"),
+    ("'", "\\'"),
+    ("<", "\\x3C"),
+    ("\n", "\\n"),
+    ("\r", "\\r"),
+    ("\u2028", "\\u2028"),
+    ("\u2029", "\\u2029"),
+]
+
+
+def iter_json_parse_chunks(value):
+    """JSON.parse('<json>') for `value`: the engine only scans the string
+    literal and then runs its JSON parser, instead of parsing the
+    equivalent object literal as JS. Escaping is per character, so it can be
+    applied chunk by chunk."""
+    yield "JSON.parse('"
+    for chunk in iter_json_chunks(value):
+        for old, new in _JS_STRING_ESCAPES:
+            if old in chunk:
+                chunk = chunk.replace(old, new)
+        yield chunk
+    yield "')"
+
+
+# ---------------------------------------------------------------------------
+# Output writing + build manifest
+# ---------------------------------------------------------------------------
+
+BUILD_MANIFEST_PATH = REPO_ROOT / "build-manifest.json"
+
+
+def repo_relpath(path):
+    """Repo-relative POSIX path for manifests/reports (absolute if outside)."""
+    try:
+        return Path(path).resolve().relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def write_if_changed(path, text):
+    """Atomically write text (UTF-8, no newline translation) to path unless
+    the file already holds exactly these bytes. Returns True if written."""
+    data = text.encode("utf-8")
+    if path.exists() and path.read_bytes() == data:
+        return False
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def build_manifest(input_paths, artifact_paths):
+    """{"inputs": {path: sha256}, "artifacts": {path: {"sha256", "size"}}}
+    for everything the build read and emitted (audio inputs are covered by
+    asset-list.json's own hashes)."""
+    return {
+        "inputs": {repo_relpath(p): file_sha256(p) for p in input_paths if p.exists()},
+        "artifacts": {
+            repo_relpath(p): {"sha256": file_sha256(p), "size": p.stat().st_size}
+            for p in artifact_paths
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Precompressed artifacts (--compress)
+# ---------------------------------------------------------------------------
+
+# Per artifact, its sha256 when its siblings were last written and which
+# suffixes were kept: {"sha256", "siblings"}.
+COMPRESS_CACHE_PATH = REPO_ROOT / ".cache" / "compress.json"
+
+# Artifacts smaller than this get no siblings: the headers and a request
+# cost more than compression could save (version.json gzips to more bytes
+# than it has).
+COMPRESS_MIN_SIZE = 1024
+
+
+def compression_codecs():
+    """{suffix: compress(bytes) -> bytes} at maximum compression. gzip is
+    always available; brotli only if the optional `brotli` package is."""
+    import gzip
+
+    codecs = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        return codecs
+    codecs[".br"] = lambda data: brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+    return codecs
+
+
+def compress_artifacts(paths, cache_path=COMPRESS_CACHE_PATH, max_workers=None):
+    """Write <name>.gz / <name>.br next to each path, in parallel.
+
+    A sibling is only kept when it is smaller than its source, and
+    artifacts under COMPRESS_MIN_SIZE get none: a server preferring
+    precompressed files would otherwise send more bytes. Siblings are only
+    rewritten when the source's sha256 differs from the one recorded in
+    cache_path (or a kept sibling is missing), so a no-op rebuild
+    recompresses nothing. gzip output carries no timestamp, so it is
+    byte-stable too. Returns one row per path: {"path", "raw", "cached",
+    suffix: compressed size or None if not compressed, ...}.
+    """
+    codecs = compression_codecs()
+    cache = {rel: entry for rel, entry in load_hash_cache(cache_path).items()
+             if (REPO_ROOT / rel).exists() and isinstance(entry, dict)}
+    rows = []
+    jobs = []
+    for path in paths:
+        rel = repo_relpath(path)
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        siblings = {suffix: path.with_name(path.name + suffix) for suffix in codecs}
+        entry = cache.get(rel, {})
+        cached = (entry.get("sha256") == digest
+                  and all(siblings[s].exists() for s in entry.get("siblings", []) if s in siblings))
+        row = {"path": rel, "raw": len(data), "cached": cached}
+        rows.append(row)
+        if not cached:
+            entry = cache[rel] = {"sha256": digest, "siblings": []}
+        for suffix, sibling in siblings.items():
+            if cached and suffix in entry["siblings"]:
+                row[suffix] = sibling.stat().st_size
+            elif cached or len(data) < COMPRESS_MIN_SIZE:
+                row[suffix] = None
+                sibling.unlink(missing_ok=True)
+            else:
+                jobs.append((row, suffix, sibling, data))
+
+    def compress_one(job):
+        row, suffix, sibling, data = job
+        packed = codecs[suffix](data)
+        if len(packed) >= len(data):
+            sibling.unlink(missing_ok=True)
+            return row, suffix, None
+        tmp_path = sibling.with_name(sibling.name + ".tmp")
+        tmp_path.write_bytes(packed)
+        os.replace(tmp_path, sibling)
+        return row, suffix, len(packed)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for row, suffix, size in pool.map(compress_one, jobs):
+            row[suffix] = size
+            if size is not None:
+                cache[row["path"]]["siblings"].append(suffix)
+    for entry in cache.values():
+        entry["siblings"].sort()
+    save_hash_cache(cache_path, cache)
+    return rows
+
+
+def remove_stale_siblings(changed):
+    """Delete the .gz / .br siblings an earlier --compress build left next
+    to the artifacts of changed ({path: rewritten}) that a build without
+    --compress rewrote, or that are older than their artifact: a server
+    preferring precompressed files would serve them instead."""
+    for path, rewritten in changed.items():
+        for suffix in (".gz", ".br"):
+            sibling = path.with_name(path.name + suffix)
+            if sibling.exists() and (rewritten or not path.exists()
+                                     or sibling.stat().st_mtime < path.stat().st_mtime):
+                sibling.unlink()
+
+
+def report_compression(rows):
+    suffixes = [s for s in (".gz", ".br") if any(s in r for r in rows)]
+    width = max([len(r["path"]) for r in rows] + [8])
+    print(f"{'artifact':<{width}} {'raw':>11}" + "".join(f" {s:>11} {'ratio':>6}" for s in suffixes))
+    totals = {"raw": 0, **{s: 0 for s in suffixes}}
+    for r in rows:
+        line = f"{r['path']:<{width}} {r['raw']:>11,}"
+        for s in suffixes:
+            if r[s] is None:
+                # Served as is: counts at its raw size in the total.
+                line += f" {'not compressed':>18}"
+                totals[s] += r["raw"]
+                continue
+            line += f" {r[s]:>11,} {r[s] / max(r['raw'], 1):>6.1%}"
+            totals[s] += r[s]
+        totals["raw"] += r["raw"]
+        print(line + ("  (unchanged)" if r["cached"] else ""))
+    line = f"{'total':<{width}} {totals['raw']:>11,}"
+    for s in suffixes:
+        line += f" {totals[s]:>11,} {totals[s] / max(totals['raw'], 1):>6.1%}"
+    print(line)
+    if ".br" not in suffixes:
+        print("brotli is not installed (pip install brotli): wrote .gz siblings only.")
+
+
 # ---------------------------------------------------------------------------
 # Build
 # ---------------------------------------------------------------------------
 
 
-def build(source_html, template_path, xlsx_path, out_path, version=1, notes=""):
+def build(source_html, template_path, xlsx_path, out_path, version=1, notes="",
+          engine="pandas", use_cache=True, jobs=1, profile=False, split_languages=False,
+          lazy_verses=False, bucket_size=DEFAULT_BUCKET_SIZE, compress=False,
+          data_format="json", json_parse=False, search_index=False, substring_index=False,
+          fuzzy_index=False, search_worker=False, persist_search=False, snippets=False,
+          autocomplete=False, bm25=False):
+    if bm25 and not search_index:
+        raise SystemExit("ERROR: --bm25 adds ranking statistics to the word indexes; "
+                         "it needs --search-index")
+    if bm25 and substring_index:
+        raise SystemExit("ERROR: --bm25 ranks word-index matches; it cannot be combined "
+                         "with --substring-index, whose substring matches have no term "
+                         "statistics")
+    if profile:
+        start_profiling()
     template_text = template_path.read_text(encoding="utf-8")
 
-    bhajans = load_bhajan_data(xlsx_path)
+    if use_cache:
+        bhajans, cache_hit = load_bhajan_data_cached(xlsx_path, engine, jobs=jobs)
+    else:
+        bhajans, cache_hit = INGEST_ENGINES[engine](xlsx_path, jobs=jobs), False
     youtube_ids = load_youtube_map(REPO_ROOT / "data" / "youtube_map.json")
     audio_ids = load_audio_map(REPO_ROOT / "data" / "audio_map.json")
 
-    versioned_audio_ids, assets = compute_audio_assets(audio_ids)
+    with profile_phase("audio hashing"):
+        versioned_audio_ids, assets = compute_audio_assets(audio_ids)
 
-    bhajans_json = json.dumps(bhajans, ensure_ascii=False)
-    youtube_json = json.dumps(youtube_ids, ensure_ascii=False)
-    audio_json = json.dumps(versioned_audio_ids, ensure_ascii=False)
+    sw_template_path = REPO_ROOT / "tools" / "sw_template.js"
+    version_path = REPO_ROOT / "version.json"
+    asset_list_path = REPO_ROOT / "asset-list.json"
+    sw_path = REPO_ROOT / "sw.js"
+    search_worker_template_path = REPO_ROOT / "tools" / "search_worker_template.js"
+    search_worker_path = REPO_ROOT / SEARCH_WORKER_NAME
+    changed = {}
+
+    with profile_phase("content layout"):
+        inline_bhajans, content_files, files = layout_content(
+            bhajans, split_languages, lazy_verses, bucket_size)
+        search_files = {}
+        if search_index:
+            with profile_phase("search index"):
+                search_entries, search_files = search_index_files(
+                    bhajans, positions=snippets, frequencies=bm25)
+            files.update(search_files)
+            content_files = dict(content_files, **search_entries)
+        if substring_index:
+            with profile_phase("substring index"):
+                rel, text = substring_index_file(bhajans)
+            search_files[rel] = text
+            files[rel] = text
+            content_files = dict(content_files, substring=rel)
+        if fuzzy_index:
+            with profile_phase("fuzzy index"):
+                rel, text = fuzzy_index_file(bhajans)
+            search_files[rel] = text
+            files[rel] = text
+            content_files = dict(content_files, fuzzy=rel)
+        if snippets:
+            with profile_phase("snippet table"):
+                rel, text = snippet_table_file(bhajans)
+            search_files[rel] = text
+            files[rel] = text
+            content_files = dict(content_files, snippets=rel)
+        if autocomplete:
+            with profile_phase("autocomplete dictionary"):
+                rel, text = autocomplete_file(bhajans)
+            search_files[rel] = text
+            files[rel] = text
+            content_files = dict(content_files, autocomplete=rel)
+        if search_worker:
+            content_files = dict(content_files, worker=SEARCH_WORKER_NAME)
+        if persist_search:
+            content_files = dict(content_files,
+                                 searchCache=search_cache_key(version, template_text, bhajans))
+        changed.update(write_content_files(out_path.parent, files))
+
+    encode = iter_json_parse_chunks if json_parse else iter_json_chunks
+    encoders = {slot: encode for slot in
+                ("{{BHAJANS_JSON}}", "{{YOUTUBE_IDS_JSON}}", "{{AUDIO_IDS_JSON}}")}
+    if data_format == "compact":
+        with profile_phase("compact encoding"):
+            inline_bhajans = encode_compact_bhajans(inline_bhajans)
+        encoders["{{BHAJANS_JSON}}"] = lambda value: iter_compact_chunks(value, encode)
+
+    # JSON serialization is streamed into the template render (see
+    # render_template), so the two are one phase.
+    with profile_phase("JSON serialization + template render"):
+        changed[out_path] = render_template(template_text, {
+            "{{BHAJANS_JSON}}": inline_bhajans,
+            "{{CONTENT_FILES_JSON}}": content_files,
+            "{{YOUTUBE_IDS_JSON}}": youtube_ids,
+            "{{AUDIO_IDS_JSON}}": versioned_audio_ids,
+        }, out_path, encoders)
+
+    asset_list = {"version": version, "assets": assets}
+    changed[asset_list_path] = write_if_changed(
+        asset_list_path, json.dumps(asset_list, ensure_ascii=False, indent=2) + "\n"
+    )
 
-    out_text = template_text.replace("{{BHAJANS_JSON}}", bhajans_json, 1)
-    out_text = out_text.replace("{{YOUTUBE_IDS_JSON}}", youtube_json, 1)
-    out_text = out_text.replace("{{AUDIO_IDS_JSON}}", audio_json, 1)
+    if search_worker:
+        with profile_phase("search worker generation"):
+            changed[search_worker_path] = build_search_worker(
+                template_text, search_worker_template_path, search_worker_path)
+    else:
+        remove_search_worker(search_worker_path)
 
-    out_path.write_text(out_text, encoding="utf-8", newline="")
+    with profile_phase("service-worker generation"):
+        shell_assets, changed[sw_path] = build_service_worker(
+            version, sw_template_path, sw_path, [SEARCH_WORKER_NAME] if search_worker else [])
 
+    # version.json's date only moves when something was actually rebuilt
+    # (or version/notes changed); a no-op rebuild leaves it byte-identical.
     version_json = {
         "version": version,
         "date": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
         "notes": notes,
     }
-    (REPO_ROOT / "version.json").write_text(
-        json.dumps(version_json, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+    try:
+        existing = json.loads(version_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        existing = None
+    if (not any(changed.values()) and isinstance(existing, dict)
+            and existing.get("version") == version and existing.get("notes") == notes):
+        changed[version_path] = False
+    else:
+        changed[version_path] = write_if_changed(
+            version_path, json.dumps(version_json, ensure_ascii=False, indent=2) + "\n"
+        )
+
+    manifest = build_manifest(
+        [template_path, xlsx_path, REPO_ROOT / "data" / "youtube_map.json",
+         REPO_ROOT / "data" / "audio_map.json", sw_template_path]
+        + ([search_worker_template_path] if search_worker else []),
+        list(changed),
     )
-
-    asset_list = {"version": version, "assets": assets}
-    (REPO_ROOT / "asset-list.json").write_text(
-        json.dumps(asset_list, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
-    )
-
-    shell_assets = build_service_worker(
-        version, REPO_ROOT / "tools" / "sw_template.js", REPO_ROOT / "sw.js"
-    )
-
+    manifest_changed = write_if_changed(
+        BUILD_MANIFEST_PATH, json.dumps(manifest, ensure_ascii=False, indent=2) + "\n")
+
+    if compress:
+        with profile_phase("compression (gzip/brotli)"):
+            compression_rows = compress_artifacts(list(changed) + [BUILD_MANIFEST_PATH])
+    else:
+        # Content files are named by their hash, so theirs never go stale
+        # (and write_content_files drops those of removed files).
+        top_level = {p: did_change for p, did_change in changed.items()
+                     if p.parent.name != CONTENT_DIRNAME}
+        top_level[BUILD_MANIFEST_PATH] = manifest_changed
+        remove_stale_siblings(top_level)
+
+    if use_cache:
+        print(f"Ingest cache {'hit' if cache_hit else 'miss'} ({xlsx_path.name}).")
     print(f"Built {out_path}: {len(bhajans)} bhajans, {len(youtube_ids)} youtube ids, "
           f"{len(audio_ids)} audio ids, {len(assets)} referenced media assets.")
+    if split_languages or lazy_verses:
+        split_out = (["verses"] if lazy_verses else []) + list(content_files["languages"])
+        print(f"Built {len(files) - len(search_files)} content file(s) in {CONTENT_DIRNAME}/: "
+              f"{', '.join(split_out)} split out of BHAJANS"
+              + (f" in buckets of {bucket_size} bhajans." if lazy_verses else "."))
+    search_sizes = {rel: len(text.encode("utf-8")) for rel, text in search_files.items()}
+    if substring_index:
+        print(f"Built substring index {content_files['substring']} "
+              f"({search_sizes.pop(content_files['substring'])} bytes).")
+    if fuzzy_index:
+        print(f"Built fuzzy index {content_files['fuzzy']} "
+              f"({search_sizes.pop(content_files['fuzzy'])} bytes).")
+    if snippets:
+        print(f"Built snippet table {content_files['snippets']} "
+              f"({search_sizes.pop(content_files['snippets'])} bytes)"
+              + ("; word indexes carry positions." if search_index else "."))
+    if autocomplete:
+        print(f"Built autocomplete dictionary {content_files['autocomplete']} "
+              f"({search_sizes.pop(content_files['autocomplete'])} bytes).")
+    if search_index:
+        languages = content_files["searchLanguages"]
+        print(f"Built search index {content_files['search']} and {len(languages)} per-language "
+              f"index(es) ({', '.join(languages) or 'none'}); "
+              f"{sum(search_sizes.values())} bytes in all"
+              + ("; with BM25 term frequencies and field lengths." if bm25 else "."))
+    if search_worker:
+        print(f"Built {SEARCH_WORKER_NAME}: searches run off the main thread "
+              f"({search_worker_path.stat().st_size} bytes).")
+    if persist_search:
+        print(f"Search indexes persist in IndexedDB under {content_files['searchCache']}.")
     print(f"Built sw.js: version={version}, shell-v{version} ({len(shell_assets)} shell assets), "
           f"media-v1 untouched by build (managed via DOWNLOAD_ASSETS/PRUNE at runtime).")
+    changed_names = [repo_relpath(p) for p, did_change in changed.items()
+                     if did_change and p.parent.name != CONTENT_DIRNAME]
+    changed_content = sum(1 for p, did_change in changed.items()
+                          if did_change and p.parent.name == CONTENT_DIRNAME)
+    if changed_content:
+        changed_names.append(f"{changed_content} file(s) in {CONTENT_DIRNAME}/")
+    if changed_names:
+        print(f"Changed artifacts: {', '.join(changed_names)} (see {BUILD_MANIFEST_PATH.name}).")
+    else:
+        print("No artifacts changed.")
+    if compress:
+        report_compression(compression_rows)
+
+    if profile:
+        report_profile(stop_profiling(), meta={
+            "engine": engine,
+            "jobs": jobs,
+            "ingest_cache": ("hit" if cache_hit else "miss") if use_cache else "off",
+            "bhajans": len(bhajans),
+            "split_languages": split_languages,
+            "lazy_verses": lazy_verses,
+            "compress": compress,
+            "format": data_format,
+            "json_parse": json_parse,
+            "search_index": search_index,
+            "substring_index": substring_index,
+            "fuzzy_index": fuzzy_index,
+            "search_worker": search_worker,
+            "persist_search": persist_search,
+            "snippets": snippets,
+            "autocomplete": autocomplete,
+            "bm25": bm25,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        })
 
 
 def main():
@@ -367,6 +2160,70 @@ def main():
     ap.add_argument("--bump", action="store_true",
                      help="increment version number by one from the existing version.json")
     ap.add_argument("--notes", default="")
+    ap.add_argument("--engine", choices=sorted(INGEST_ENGINES), default="pandas",
+                     help="xlsx ingestion backend: pandas DataFrame (default) or "
+                          "streaming openpyxl read-only rows (identical output)")
+    ap.add_argument("--no-cache", action="store_true",
+                     help="ignore and do not update the .cache/ingest xlsx cache")
+    ap.add_argument("--jobs", type=int, default=1,
+                     help="clean the language columns in N worker processes "
+                          "(pandas engine only; default 1 = in-process)")
+    ap.add_argument("--profile", action="store_true",
+                     help="time each build phase, record tracemalloc peaks, print a "
+                          "table and write build-profile.json")
+    ap.add_argument("--split-languages", action="store_true",
+                     help="keep only the original text inline and write each "
+                          "translation to its own hashed content/<lang>.<hash>.json "
+                          "shard, fetched by the page on demand")
+    ap.add_argument("--lazy-verses", action="store_true",
+                     help="inline only a title catalog; write verses to hashed "
+                          "content/verses-<bucket>.<hash>.json chunks loaded when a "
+                          "bhajan is opened")
+    ap.add_argument("--bucket-size", type=int, default=DEFAULT_BUCKET_SIZE,
+                     help=f"bhajans per --lazy-verses chunk (default {DEFAULT_BUCKET_SIZE})")
+    ap.add_argument("--format", choices=DATA_FORMATS, default="json", dest="data_format",
+                     help="BHAJANS wire format: plain JSON (default) or 'compact' "
+                          "(interned author/category tables, positional verse "
+                          "rows, decoded by decodeBhajans in the page)")
+    ap.add_argument("--json-parse", action="store_true",
+                     help="emit BHAJANS, YOUTUBE_IDS and AUDIO_IDS as JSON.parse('...') "
+                          "string literals (faster to parse than object literals)")
+    ap.add_argument("--search-index", action="store_true",
+                     help="precompute the diacritic-folded token inverted index and "
+                          "write it to a hashed content/search.<hash>.json the page "
+                          "loads on the first search")
+    ap.add_argument("--bm25", action="store_true",
+                     help="with --search-index: store term frequencies and field-length "
+                          "statistics in the word indexes so the page ranks matches "
+                          "by BM25 with field boosts, every query word required")
+    ap.add_argument("--substring-index", action="store_true",
+                     help="build a suffix array over the normalized titles and verse "
+                          "text (content/substring.<hash>.json) so the page answers "
+                          "substring searches by binary search")
+    ap.add_argument("--fuzzy-index", action="store_true",
+                     help="build a bigram index of spelling-tolerant phonetic keys "
+                          "(content/fuzzy.<hash>.json) so searches also find "
+                          "romanization variants and typos (up to 2 edits)")
+    ap.add_argument("--snippets", action="store_true",
+                     help="write a folded-to-original offset table "
+                          "(content/snippets.<hash>.json) and word positions in the "
+                          "word indexes so search results show the matching verse "
+                          "line, highlighted")
+    ap.add_argument("--autocomplete", action="store_true",
+                     help="write a sorted, front-coded dictionary of the folded title, "
+                          "author and first-line words with their document frequencies "
+                          "(content/autocomplete.<hash>.json) for search-box suggestions")
+    ap.add_argument("--search-worker", action="store_true",
+                     help=f"emit {SEARCH_WORKER_NAME} next to sw.js and run page "
+                          "searches in it, off the main thread")
+    ap.add_argument("--persist-search", action="store_true",
+                     help="let the page keep its loaded search indexes in IndexedDB, "
+                          "keyed by the build version, so later launches skip "
+                          "fetching and rebuilding them")
+    ap.add_argument("--compress", action="store_true",
+                     help="also write maximum-compression .gz (and, if the brotli "
+                          "package is installed, .br) siblings of every artifact and "
+                          "print a size report")
     args = ap.parse_args()
 
     version = resolve_version(args.version, args.bump)
@@ -378,6 +2235,24 @@ def main():
         out_path=REPO_ROOT / args.out,
         version=version,
         notes=args.notes,
+        engine=args.engine,
+        use_cache=not args.no_cache,
+        jobs=args.jobs,
+        profile=args.profile,
+        split_languages=args.split_languages,
+        lazy_verses=args.lazy_verses,
+        bucket_size=args.bucket_size,
+        compress=args.compress,
+        data_format=args.data_format,
+        json_parse=args.json_parse,
+        search_index=args.search_index,
+        substring_index=args.substring_index,
+        fuzzy_index=args.fuzzy_index,
+        search_worker=args.search_worker,
+        persist_search=args.persist_search,
+        snippets=args.snippets,
+        autocomplete=args.autocomplete,
+        bm25=args.bm25,
     )
 
 
@@ -101,17 +101,20 @@ def load_bhajan_data_from_excel(excel_file_path=None):
             df = df.dropna(subset=['Verse_Number'])
             df['Verse_Number'] = df['Verse_Number'].astype(int)
             
+            # Skip rows where any critical field is empty
+            df = df[df['Bhajan_Title'].map(bool) & df['Author'].map(bool) & df['Category'].map(bool)]
+
+            # One stable sort on (title first-appearance order, verse number):
+            # each bhajan's rows end up contiguous and already in verse order
+            df = df.assign(_title_order=pd.factorize(df['Bhajan_Title'])[0])
+            df = df.sort_values(['_title_order', 'Verse_Number'], kind='stable')
+
             # Process the data
             bhajans = {}
-            for _, row in df.iterrows():
-                title = row['Bhajan_Title']
-                author = row['Author'] 
-                category = row['Category']
-                
-                # Skip if any critical field is empty
-                if not title or not author or not category:
-                    continue
-                    
+            columns = ['Bhajan_Title', 'Author', 'Category', 'Verse_Number',
+                       'Original', 'English', 'Russian', 'Latvian']
+            for title, author, category, number, original, english, russian, latvian in \
+                    df[columns].itertuples(index=False, name=None):
                 if title not in bhajans:
                     bhajans[title] = {
                         'title': title,
@@ -119,19 +122,15 @@ def load_bhajan_data_from_excel(excel_file_path=None):
                         'category': category,
                         'verses': []
                     }
-                
+
                 bhajans[title]['verses'].append({
-                    'number': int(row['Verse_Number']),
-                    'original': row['Original'],
-                    'english': row['English'],
-                    'russian': row.get('Russian', '') if 'Russian' in df.columns else '',
-                    'latvian': row.get('Latvian', '') if 'Latvian' in df.columns else ''
+                    'number': int(number),
+                    'original': original,
+                    'english': english,
+                    'russian': russian,
+                    'latvian': latvian
                 })
-            
-            # Sort verses by number for each bhajan
-            for title in bhajans:
-                bhajans[title]['verses'].sort(key=lambda x: x['number'])
-            
+
             # Convert to list and filter out empty bhajans
             result = [bhajan for bhajan in bhajans.values() if bhajan['verses']]
             return result
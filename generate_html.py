@@ -125,14 +125,18 @@ def load_bhajan_data(excel_path):
     df = df.dropna(subset=['Verse_Number'])
     df['Verse_Number'] = df['Verse_Number'].astype(int)
 
+    # One stable sort on (title first-appearance order, verse number), then
+    # group: each bhajan's rows are contiguous and already in verse order
+    df = df[(df['Bhajan_Title'] != '') & (df['Author'] != '') & (df['Category'] != '')]
+    df = df.assign(_title_order=pd.factorize(df['Bhajan_Title'])[0])
+    df = df.sort_values(['_title_order', 'Verse_Number'], kind='stable')
+
     # Group by bhajan title
     bhajans = {}
-    for _, row in df.iterrows():
-        title = row['Bhajan_Title']
-        author = row['Author']
-        category = row['Category']
-        if not title or not author or not category:
-            continue
+    columns = ['Bhajan_Title', 'Author', 'Category', 'Verse_Number',
+               'Original', 'English', 'Russian', 'Latvian']
+    for title, author, category, number, original, english, russian, latvian in \
+            df[columns].itertuples(index=False, name=None):
         if title not in bhajans:
             bhajans[title] = {
                 'title': title,
@@ -141,17 +145,13 @@ def load_bhajan_data(excel_path):
                 'verses': []
             }
         bhajans[title]['verses'].append({
-            'number': int(row['Verse_Number']),
-            'original': row['Original'],
-            'english': row['English'],
-            'russian': row.get('Russian', ''),
-            'latvian': row.get('Latvian', '')
+            'number': int(number),
+            'original': original,
+            'english': english,
+            'russian': russian,
+            'latvian': latvian
         })
 
-    # Sort verses
-    for title in bhajans:
-        bhajans[title]['verses'].sort(key=lambda x: x['number'])
-
     result = [b for b in bhajans.values() if b['verses']]
     return result
 
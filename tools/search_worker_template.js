@@ -0,0 +1,69 @@
+// search_worker_template.js - source template for the generated search-worker.js.
+//
+// build.py --search-worker copies this file to search-worker.js at the repo
+// root (next to sw.js), replacing:
+//   {{SEARCH_ENGINE_JS}}  -> the search engine section of template.html
+//                            ("// ---- Search (H1) ----" up to "// ----
+//                            End of search engine ----"), verbatim
+//
+// The page (see "Search worker" in template.html) posts:
+//   {type: 'data', contentFiles, bhajans}   CONTENT_FILES and the searchable
+//                                           fields of every bhajan
+//   {type: 'load', languages}               start fetching the indexes
+//   {type: 'search', id, query, languages}  run searchBhajans(query, languages)
+//   {type: 'cancel'}                        drop the pending query
+// and gets {id, results: [{id, rank, score, field, fuzzy, hit}], complete}
+// back for each query that ran: result ids index its BHAJANS, and complete
+// says whether verse text outside the chunks sent so far was searched too.
+// Queries are answered newest first: one that a newer query overtook while
+// the worker was busy (or waiting for an index) is dropped unanswered.
+
+let BHAJANS = [];
+let CONTENT_FILES = {};
+
+{{SEARCH_ENGINE_JS}}
+
+let bhajanIds = new Map();  // BHAJANS entry -> its id
+let pendingSearch = null;   // newest query not started yet
+let searching = false;
+
+self.onmessage = (event) => {
+  const msg = event.data;
+  if (msg.type === 'data') {
+    CONTENT_FILES = msg.contentFiles;
+    BHAJANS = msg.bhajans;
+    bhajanIds = new Map(BHAJANS.map((b, id) => [b, id]));
+    if (searchIndexComplete) SEARCH_INDEX.forEach((entry, id) => { entry.b = BHAJANS[id]; });
+    else SEARCH_INDEX = null;
+  } else if (msg.type === 'load') {
+    loadSearchIndex(msg.languages);
+  } else if (msg.type === 'search') {
+    pendingSearch = msg;
+    if (!searching) runSearches();
+  } else if (msg.type === 'cancel') {
+    pendingSearch = null;
+  }
+};
+
+// Lets queued messages in, so that a burst of keystrokes collapses into
+// its newest query.
+function yieldToMessages() {
+  return new Promise(resolve => setTimeout(resolve, 0));
+}
+
+async function runSearches() {
+  searching = true;
+  await yieldToMessages();
+  while (pendingSearch) {
+    const msg = pendingSearch;
+    await loadSearchIndex(msg.languages);
+    if (pendingSearch !== msg) continue; // overtaken while the indexes loaded
+    pendingSearch = null;
+    const results = searchBhajans(msg.query, msg.languages).map(r => ({
+      id: bhajanIds.get(r.b), rank: r.rank, score: r.score, field: r.field, fuzzy: !!r.fuzzy, hit: r.hit,
+    }));
+    self.postMessage({ id: msg.id, results, complete: searchCoversAllVerses() });
+    await yieldToMessages();
+  }
+  searching = false;
+}
@@ -11,10 +11,16 @@
 //   - media-v1    : the offline audio library. Never rotates with the shell version;
 //                    only ever grows/shrinks via explicit DOWNLOAD_ASSETS / PRUNE
 //                    messages from the page, or lazily on first play while online.
+//   - content-v1  : out-of-line text (content/<name>.<hash8>.json, build.py
+//                    --split-languages / --lazy-verses). URLs are content-hashed,
+//                    so entries are cached on first fetch and never revalidated;
+//                    PRECACHE_CONTENT from the page fills it in the background
+//                    and drops files from older builds.
 
 const SW_VERSION = '{{SW_VERSION}}';
 const SHELL_CACHE = 'shell-v' + SW_VERSION;
 const MEDIA_CACHE = 'media-v1';
+const CONTENT_CACHE = 'content-v1';
 const SHELL_ASSETS = {{SHELL_ASSETS}};
 
 // ---------------------------------------------------------------------------
@@ -42,7 +48,8 @@ self.addEventListener('activate', (event) => {
         names
           .filter((name) => name.startsWith('shell-v') && name !== SHELL_CACHE)
           .map((name) => caches.delete(name))
-        // media-v1 is never touched here - it rotates only via explicit PRUNE.
+        // media-v1 is never touched here - it rotates only via explicit PRUNE;
+        // content-v1 is pruned via PRECACHE_CONTENT against the page's CONTENT_FILES.
       ))
       .then(() => self.clients.claim())
   );
@@ -63,6 +70,10 @@ function isAudioRequest(url) {
   return /\/audio\/[^/]+\.ogg$/.test(url.pathname);
 }
 
+function isContentRequest(url) {
+  return /\/content\/[^/]+\.[0-9a-f]{8}\.json$/.test(url.pathname);
+}
+
 function isShellStaticAsset(url) {
   return /\/(fonts\/[^/]+\.woff2|icons\/[^/]+\.(png|svg)|manifest\.json)$/.test(url.pathname);
 }
@@ -161,7 +172,10 @@ self.addEventListener('fetch', (event) => {
   // Cross-origin (YouTube iframes, etc.) - network only, no interception.
   if (url.origin !== self.location.origin) return;
 
-  if (isNavigationRequest(request) || url.pathname.endsWith('/index.html')) {
+  // The search worker (build.py --search-worker) is rebuilt with the page,
+  // so it is kept fresh the same way.
+  if (isNavigationRequest(request) || url.pathname.endsWith('/index.html') ||
+      url.pathname.endsWith('/search-worker.js')) {
     event.respondWith(networkFirst(request));
     return;
   }
@@ -171,6 +185,10 @@ self.addEventListener('fetch', (event) => {
     event.respondWith(serveAudio(request));
     return;
   }
+  if (isContentRequest(url)) {
+    event.respondWith(cacheFirst(request, CONTENT_CACHE, true));
+    return;
+  }
   if (isShellStaticAsset(url)) {
     event.respondWith(cacheFirst(request, SHELL_CACHE, true));
     return;
@@ -180,7 +198,7 @@ self.addEventListener('fetch', (event) => {
 });
 
 // ---------------------------------------------------------------------------
-// message: DOWNLOAD_ASSETS / PRUNE
+// message: DOWNLOAD_ASSETS / PRUNE / PRECACHE_CONTENT
 // ---------------------------------------------------------------------------
 
 function postToClient(client, msg) {
@@ -277,6 +295,37 @@ async function pruneMedia(keepUrls) {
   );
 }
 
+// Background fill of content-v1: drop entries not in keepUrls (files from
+// older builds), then fetch the missing urls a few at a time. Failures are
+// ignored - the fetch handler still caches content on first use.
+async function precacheContent(urls, keepUrls) {
+  const cache = await caches.open(CONTENT_CACHE);
+  const keepSet = new Set(keepUrls.map(toPathKey));
+  const requests = await cache.keys();
+  await Promise.all(
+    requests
+      .filter((req) => !keepSet.has(toPathKey(req.url)))
+      .map((req) => cache.delete(req))
+  );
+  const CONCURRENCY = 3;
+  let index = 0;
+  async function worker() {
+    while (index < urls.length) {
+      const url = urls[index++];
+      try {
+        if (!(await cache.match(url))) await cache.add(url);
+      } catch (err) {
+        // Offline or quota - leave it to on-demand caching.
+      }
+    }
+  }
+  const workers = [];
+  for (let i = 0; i < Math.min(CONCURRENCY, urls.length); i++) {
+    workers.push(worker());
+  }
+  await Promise.all(workers);
+}
+
 self.addEventListener('message', (event) => {
   const data = event.data;
   if (!data || !data.type) return;
@@ -284,5 +333,7 @@ self.addEventListener('message', (event) => {
     event.waitUntil(downloadAssets(data.assets || [], event.source, data.keepUrls || []));
   } else if (data.type === 'PRUNE') {
     event.waitUntil(pruneMedia(data.keepUrls || []));
+  } else if (data.type === 'PRECACHE_CONTENT') {
+    event.waitUntil(precacheContent(data.urls || [], data.keepUrls || []));
   }
 });
@@ -7,6 +7,13 @@ Compares a rebuilt index.html against a deployed/reference index.html
 
 1. Parses BHAJANS out of both files and asserts deep equality. Every
    difference is reported with bhajan title + verse number coordinates.
+   Verses and translations moved out by build.py --lazy-verses /
+   --split-languages are read back from the content/ files listed in
+   CONTENT_FILES first, and --format compact / --json-parse literals are
+   decoded, so such builds compare equal to a plain inline one. Prebuilt
+   search indexes (--search-index, --substring-index, --fuzzy-index), the
+   --snippets table and the --autocomplete dictionary must equal ones
+   rebuilt from the built BHAJANS.
 2. Asserts everything OUTSIDE the three JSON blobs (BHAJANS, YOUTUBE_IDS,
    AUDIO_IDS) is byte-identical between the two files (line endings are
    normalized before compare since the working tree may check out CRLF via
@@ -24,6 +31,7 @@ not a failure of the generator itself -- see --strict).
 Usage:
     python tools/verify_roundtrip.py --built index.html.rebuilt \
         --reference index.html [--xlsx Bhajans.xlsx] [--strict]
+        [--engine pandas|openpyxl]
 """
 import argparse
 import json
@@ -34,6 +42,55 @@ from pathlib import Path
 REPO_ROOT = Path(__file__).resolve().parent.parent
 
 VARNAMES = ["BHAJANS", "YOUTUBE_IDS", "AUDIO_IDS"]
+# Present only in pages built from a template that has the slot; describes
+# where out-of-line content lives rather than content itself, so it is
+# excluded from the byte-identity check and not compared.
+OPTIONAL_VARNAMES = ["CONTENT_FILES"]
+
+
+def decode_compact_bhajans(data):
+    """Python twin of decodeBhajans in template.html (build.py --format
+    compact); plain BHAJANS lists are returned unchanged."""
+    head = data[0] if data else None
+    if not isinstance(head, dict) or head.get("format") != "compact-1":
+        return data
+    out = []
+    for i in range(head["count"]):
+        b = {}
+        for key in head["keys"]:
+            value = head["columns"][key][i]
+            b[key] = head["tables"][key][value] if key in head["tables"] else value
+        if head["verseKeys"] is not None:
+            b["verses"] = [dict(zip(head["verseKeys"], row)) for row in data[i + 1]]
+        out.append(b)
+    return out
+
+
+_JS_STRING_ESCAPE_RE = re.compile(r"\\(x[0-9A-Fa-f]{2}|u[0-9A-Fa-f]{4}|.)", re.DOTALL)
+_JS_SIMPLE_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+
+
+def unescape_js_string(body):
+    """Value of a single-quoted JS string literal's body (build.py --json-parse)."""
+    def replace(m):
+        esc = m.group(1)
+        if esc[0] in "xu" and len(esc) > 1:
+            return chr(int(esc[1:], 16))
+        return _JS_SIMPLE_ESCAPES.get(esc, esc)
+    return _JS_STRING_ESCAPE_RE.sub(replace, body)
+
+
+def parse_literal(expr):
+    """Parse the right-hand side of a `const X = ...;` data line: a JSON
+    literal or a JSON.parse('...') string literal (build.py --json-parse),
+    optionally wrapped in decodeBhajans(...) (--format compact)."""
+    wrapper = "decodeBhajans("
+    if expr.startswith(wrapper) and expr.endswith(")"):
+        return decode_compact_bhajans(parse_literal(expr[len(wrapper):-1]))
+    wrapper = "JSON.parse('"
+    if expr.startswith(wrapper) and expr.endswith("')"):
+        return json.loads(unescape_js_string(expr[len(wrapper):-2]))
+    return json.loads(expr)
 
 
 def extract_literals(html_path):
@@ -44,17 +101,133 @@ def extract_literals(html_path):
     literals = {}
     for i, line in enumerate(lines):
         stripped = line.strip()
-        for varname in VARNAMES:
+        for varname in VARNAMES + OPTIONAL_VARNAMES:
             prefix = f"const {varname} = "
             if stripped.startswith(prefix):
                 json_str = stripped[len(prefix):].rstrip(";")
-                literals[varname] = (json.loads(json_str), i)
+                literals[varname] = (parse_literal(json_str), i)
     missing = [v for v in VARNAMES if v not in literals]
     if missing:
         raise SystemExit(f"ERROR: {html_path} missing literal(s): {', '.join(missing)}")
     return literals, lines
 
 
+# Catalog-only keys of a --lazy-verses BHAJANS entry, derived from its verses.
+CATALOG_KEYS = ("firstLine", "verseCount")
+
+
+def read_content_file(html_path, rel, expected_len):
+    path = Path(html_path).parent / rel
+    if not path.exists():
+        raise SystemExit(f"ERROR: {html_path} references missing content file {rel}")
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if len(data) != expected_len:
+        raise SystemExit(f"ERROR: {rel} has {len(data)} entries, its bucket has {expected_len}")
+    return data
+
+
+def expand_content(literals, html_path):
+    """Merge out-of-line content files (build.py --split-languages /
+    --lazy-verses) back into BHAJANS in place, so split and inline builds
+    compare equal."""
+    content_files = literals.get("CONTENT_FILES", ({}, None))[0]
+    if not content_files:
+        return
+    bhajans = literals["BHAJANS"][0]
+    size = content_files.get("bucketSize") or len(bhajans)
+    buckets = [bhajans[i:i + size] for i in range(0, len(bhajans), size)] if size else []
+    for k, rel in enumerate(content_files.get("verses", [])):
+        chunk = read_content_file(html_path, rel, len(buckets[k]))
+        for b, verses in zip(buckets[k], chunk):
+            if b.get("verseCount") != len(verses):
+                raise SystemExit(f"ERROR: {rel}: [{b.get('title')}] catalog verseCount "
+                                 f"{b.get('verseCount')} != {len(verses)} verses")
+            for key in CATALOG_KEYS:
+                b.pop(key, None)
+            b["verses"] = verses
+    for field, rels in content_files.get("languages", {}).items():
+        for k, rel in enumerate(rels):
+            shard = read_content_file(html_path, rel, len(buckets[k]))
+            for b, texts in zip(buckets[k], shard):
+                for v, text in zip(b["verses"], texts):
+                    v[field] = text
+
+
+def check_search_index(literals, html_path):
+    """Diffs between the prebuilt search indexes a page references
+    (build.py --search-index / --substring-index / --fuzzy-index /
+    --snippets / --autocomplete) and ones rebuilt from its expanded
+    BHAJANS; None when the page has none."""
+    content_files = literals.get("CONTENT_FILES", ({}, None))[0]
+    if not any(content_files.get(key) for key in ("search", "substring", "fuzzy", "snippets", "autocomplete")):
+        return None
+    sys.path.insert(0, str(REPO_ROOT))
+    import build as build_mod
+
+    bhajans = literals["BHAJANS"][0]
+    indexes = []
+    diffs = []
+    positions = bool(content_files.get("snippets"))
+    # --bm25 leaves no trace in CONTENT_FILES; the main index says so itself
+    # (and every index, rebuilt the same way, must then agree).
+    main_index = Path(html_path).parent / content_files.get("search", "")
+    frequencies = (content_files.get("search") and main_index.exists()
+                   and json.loads(main_index.read_text(encoding="utf-8")).get("frequencies", False))
+    if content_files.get("search"):
+        indexes.append((content_files["search"], lambda: build_mod.build_search_index(
+            bhajans, positions=positions, frequencies=frequencies)))
+        for language, rel in sorted(content_files.get("searchLanguages", {}).items()):
+            indexes.append((rel, lambda language=language: build_mod.build_search_index(
+                bhajans, language, positions, frequencies)))
+        diffs += [f"no search index for {field}" for field in build_mod.translation_fields(bhajans)
+                  if field not in content_files.get("searchLanguages", {})]
+    if content_files.get("substring"):
+        indexes.append((content_files["substring"], lambda: build_mod.build_substring_index(bhajans)))
+    if content_files.get("fuzzy"):
+        indexes.append((content_files["fuzzy"], lambda: build_mod.build_fuzzy_index(bhajans)))
+    if content_files.get("snippets"):
+        indexes.append((content_files["snippets"], lambda: build_mod.build_snippet_table(bhajans)))
+    if content_files.get("autocomplete"):
+        indexes.append((content_files["autocomplete"],
+                        lambda: build_mod.build_autocomplete_dictionary(bhajans)))
+    for rel, rebuild in indexes:
+        path = Path(html_path).parent / rel
+        if not path.exists():
+            diffs.append(f"missing search index {rel}")
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            shipped = json.load(f)
+        expected = rebuild()
+        diffs += [f"{rel}: {key} differs" for key in expected if shipped.get(key) != expected[key]]
+        if "terms" in expected and shipped.get("terms") != expected["terms"]:
+            shipped_terms, expected_terms = set(shipped.get("terms") or []), set(expected["terms"])
+            diffs += [f"term only in {rel}: {t!r}" for t in sorted(shipped_terms - expected_terms)[:20]]
+            diffs += [f"term missing from {rel}: {t!r}" for t in sorted(expected_terms - shipped_terms)[:20]]
+    if frequencies:
+        diffs += check_bm25_ranking(build_mod, build_mod.build_search_index(
+            bhajans, positions=positions, frequencies=True), bhajans)
+    return diffs
+
+
+def check_bm25_ranking(build_mod, index, bhajans):
+    """Title words whose BM25 scores (build.py --bm25) put a bhajan that
+    has the word only in its verses level with or above one titled with
+    it."""
+    diffs = []
+    title_slot = index["fields"].index("title")
+    verse_slot = len(index["fields"])
+    words = sorted({t for b in bhajans for t in build_mod.search_tokens(b["title"], index["fold"])})
+    for word in words:
+        scores = build_mod.bm25_word_scores(index, word)
+        titled = [sum(s) for s in scores.values() if s[title_slot]]
+        in_verses = [sum(s) for s in scores.values() if s[verse_slot] and not any(s[:verse_slot])]
+        if titled and in_verses and min(titled) <= max(in_verses):
+            diffs.append(f"bm25: a verse-only match for {word!r} scores {max(in_verses):.3f}, "
+                         f"a title match {min(titled):.3f}")
+    return diffs
+
+
 def lines_outside_literals(lines, literal_line_indices):
     """Return the file's lines with the literal lines blanked to a placeholder marker,
     for byte-identity comparison of everything else."""
@@ -124,13 +297,13 @@ def deep_diff_bhajans(built, reference, path=""):
     return diffs
 
 
-def diff_xlsx_vs_html(xlsx_path, reference_bhajans):
+def diff_xlsx_vs_html(xlsx_path, reference_bhajans, engine="pandas"):
     """Compare xlsx-derived BHAJANS (post clean_text) against the reference HTML's
     BHAJANS to find hand-edits present only in the deployed HTML."""
     sys.path.insert(0, str(REPO_ROOT))
     import build as build_mod  # local import to avoid hard dependency if unused
 
-    xlsx_bhajans = build_mod.load_bhajan_data(xlsx_path)
+    xlsx_bhajans = build_mod.INGEST_ENGINES[engine](xlsx_path)
     return deep_diff_bhajans(xlsx_bhajans, reference_bhajans)
 
 
@@ -141,6 +314,8 @@ def main():
     ap.add_argument("--xlsx", default=None, help="also diff xlsx-derived data against reference HTML")
     ap.add_argument("--strict", action="store_true",
                      help="treat any xlsx<->HTML content diff as a gate failure too")
+    ap.add_argument("--engine", choices=["pandas", "openpyxl"], default="pandas",
+                     help="build.py ingestion backend used for the --xlsx diff")
     args = ap.parse_args()
 
     built_path = REPO_ROOT / args.built
@@ -148,6 +323,8 @@ def main():
 
     built_literals, built_lines = extract_literals(built_path)
     ref_literals, ref_lines = extract_literals(ref_path)
+    expand_content(built_literals, built_path)
+    expand_content(ref_literals, ref_path)
 
     ok = True
 
@@ -182,6 +359,16 @@ def main():
         else:
             print(f"OK  {varname}: deep-equal ({len(ref_val) if isinstance(ref_val, (list, dict)) else '-'} entries)")
 
+    # 1b. The prebuilt search index (if any) indexes exactly the built BHAJANS
+    search_diffs = check_search_index(built_literals, built_path)
+    if search_diffs:
+        ok = False
+        print(f"=== search index: {len(search_diffs)} difference(s) ===")
+        for d in search_diffs[:200]:
+            print(" -", d)
+    elif search_diffs is not None:
+        print("OK  search indexes match BHAJANS")
+
     # 2. Byte-identity outside the literal lines
     built_literal_idx = {idx for _, idx in built_literals.values()}
     ref_literal_idx = {idx for _, idx in ref_literals.values()}
@@ -203,7 +390,7 @@ def main():
     if args.xlsx:
         xlsx_path = REPO_ROOT / args.xlsx
         ref_bhajans, _ = ref_literals["BHAJANS"]
-        xlsx_diffs = diff_xlsx_vs_html(xlsx_path, ref_bhajans)
+        xlsx_diffs = diff_xlsx_vs_html(xlsx_path, ref_bhajans, args.engine)
         if xlsx_diffs:
             print(f"=== xlsx <-> deployed HTML content diffs: {len(xlsx_diffs)} " +
                   ("(GATE FAILURE, --strict)" if args.strict else "(informational, not a gate failure)") + " ===")